@@ -4,12 +4,15 @@ Shared SQLite + sqlite-vec database module for compound-learning plugin.
 All four Python scripts import from here instead of duplicating database boilerplate.
 """
 
+import copy
+import functools
+import hashlib
 import json
 import os
 import sys
 import threading
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 try:
     import sqlite3
@@ -31,12 +34,46 @@ except AttributeError:
         )
         raise
 
+# orjson is optional: several times faster than the stdlib for the config,
+# sidecar files and search output, with the same result either way.
+try:
+    import orjson
+
+    json_loads = orjson.loads
+
+    def json_dumps(obj: Any, indent: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj: Any, indent: bool = False) -> str:
+        return json.dumps(obj, indent=2 if indent else None)
+
 _model = None
 _model_lock = threading.Lock()
 
 
+# Environment variables load_config reads; a change to any of them invalidates
+# the cached config.
+_CONFIG_ENV_VARS = (
+    'HOME', 'CLAUDE_PLUGIN_ROOT', 'SQLITE_DB_PATH',
+    'LEARNINGS_GLOBAL_DIR', 'LEARNINGS_REPO_SEARCH_PATH',
+)
+
+
 def load_config() -> Dict[str, Any]:
-    """Load configuration from environment variables, then config file, then defaults."""
+    """Load configuration from environment variables, then config file, then defaults.
+
+    The merged result is cached per snapshot of the relevant environment
+    variables; callers get their own copy so mutating it is safe.
+    """
+    env_snapshot = tuple(os.environ.get(k) for k in _CONFIG_ENV_VARS)
+    return copy.deepcopy(_load_config_cached(env_snapshot))
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config_cached(env_snapshot: tuple) -> Dict[str, Any]:
+    """Build the merged config. env_snapshot is only the cache key."""
     home = os.path.expanduser('~')
 
     defaults: Dict[str, Any] = {
@@ -71,8 +108,7 @@ def load_config() -> Dict[str, Any]:
 
     if config_file.exists():
         try:
-            with open(config_file, 'r') as f:
-                file_config = json.load(f)
+            file_config = json_loads(config_file.read_bytes())
             # Expand ${HOME} in all string values recursively
             file_config = _expand_home(file_config, home)
         except Exception as e:
@@ -115,6 +151,15 @@ def _deep_merge(base: Dict, override: Dict) -> Dict:
     return result
 
 
+def doc_id_for_path(path: str) -> str:
+    """Stable document id for a learning file's canonical path string.
+
+    BLAKE2b-128: the id only has to be stable and collision-free, and blake2b
+    is faster than MD5 on short inputs.
+    """
+    return hashlib.blake2b(os.fsencode(path), digest_size=16).hexdigest()
+
+
 def get_connection(config: Dict[str, Any]) -> sqlite3.Connection:
     """Open SQLite DB, load sqlite-vec extension, create schema if missing."""
     try:
@@ -137,10 +182,43 @@ def get_connection(config: Dict[str, Any]) -> sqlite3.Connection:
     sqlite_vec.load(conn)
     conn.enable_load_extension(False)
 
-    _create_schema(conn)
+    # Every search and every hook invocation opens its own connection, so
+    # skip the DDL and migration attempts once the database is up to date.
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        _create_schema(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
     return conn
 
 
+# Connection settings for bulk indexing runs. WAL plus synchronous=NORMAL
+# fsyncs at checkpoints instead of on every commit; a crash can lose the last
+# few commits but never corrupts the database, and the index can always be
+# rebuilt from the files. WAL persists in the database file and also lets
+# searches read while an index run writes; the rest is per connection, so the
+# one-file --file path and searches keep the defaults.
+BULK_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",      # 64 MiB
+    "PRAGMA mmap_size=268435456",    # 256 MiB
+)
+
+
+def apply_bulk_pragmas(conn: sqlite3.Connection) -> None:
+    """Tune *conn* for a bulk write run (see BULK_PRAGMAS)."""
+    for pragma in BULK_PRAGMAS:
+        conn.execute(pragma).fetchall()
+
+
+# Stored in PRAGMA user_version; bump whenever _create_schema changes so
+# existing databases pick up the change on their next open.
+SCHEMA_VERSION = 2
+
+FTS_MERGE_SETTINGS = (('automerge', 8), ('crisismerge', 32))
+
+
 def _create_schema(conn: sqlite3.Connection) -> None:
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS learnings (
@@ -164,9 +242,25 @@ def _create_schema(conn: sqlite3.Connection) -> None:
             content,
             tokenize='porter unicode61'
         );
+
+        CREATE TABLE IF NOT EXISTS query_embeddings (
+            query TEXT PRIMARY KEY,
+            embedding BLOB NOT NULL
+        );
     """)
     conn.commit()
 
+    # FTS5 merges its index segments incrementally on every write; the
+    # defaults (automerge=4, crisismerge=16) are tuned for large, write-heavy
+    # tables. Letting more segments accumulate before a merge cuts that
+    # work down during bulk indexing, at the cost of a few more b-trees per query,
+    # which is negligible at a few thousand learnings. The settings persist
+    # in the table, so only write them once.
+    if conn.execute("SELECT 1 FROM fts_learnings_config WHERE k = 'automerge'").fetchone() is None:
+        for option, value in FTS_MERGE_SETTINGS:
+            conn.execute("INSERT INTO fts_learnings(fts_learnings, rank) VALUES (?, ?)", (option, value))
+        conn.commit()
+
     # Idempotent migration: add hit-count columns
     for col, col_def in [
         ('access_count', 'INTEGER DEFAULT 0'),
@@ -179,8 +273,8 @@ def _create_schema(conn: sqlite3.Connection) -> None:
             pass  # Column already exists
 
 
-def get_embedding(text: str):
-    """Lazy-load sentence-transformers model and return embedding as list."""
+def _get_model():
+    """Lazy-load the sentence-transformers model (thread-safe)."""
     global _model
     with _model_lock:
         if _model is None:
@@ -199,61 +293,216 @@ def get_embedding(text: str):
                 )
                 raise
             _model = SentenceTransformer('all-MiniLM-L6-v2')
-    return _model.encode(text, normalize_embeddings=True).tolist()
+    return _model
 
 
-def upsert_document(
+def get_embedding(text: str):
+    """Lazy-load sentence-transformers model and return embedding as list."""
+    return _get_model().encode(text, normalize_embeddings=True).tolist()
+
+
+def get_embeddings(texts: List[str]) -> List[List[float]]:
+    """Embed several texts in one batched forward pass."""
+    if not texts:
+        return []
+    return _get_model().encode(texts, normalize_embeddings=True).tolist()
+
+
+# Search keywords whose embeddings are kept in query_embeddings. Hooks search
+# with the same keywords again and again, and a search whose keywords are all
+# cached never loads the model at all.
+QUERY_CACHE_SIZE = 2000
+
+# How long storing query embeddings waits for a write lock held by an index
+# run, rather than the connection's default of 5 s, before giving up.
+QUERY_CACHE_BUSY_TIMEOUT_MS = 50
+
+
+def get_query_embeddings(conn: sqlite3.Connection, texts: List[str]) -> List[List[float]]:
+    """Embeddings for search query *texts*, in order, via the query_embeddings cache.
+
+    Only texts not yet cached are embedded (in one batch), then stored with
+    the oldest entries beyond QUERY_CACHE_SIZE evicted. Caching is best
+    effort: if an index run holds the write lock, the fresh embeddings are
+    returned without being stored after at most QUERY_CACHE_BUSY_TIMEOUT_MS.
+    """
+    import struct
+
+    if not texts:
+        return []
+    unique = list(dict.fromkeys(texts))
+    placeholders = ','.join('?' * len(unique))
+    cached = {
+        row[0]: list(struct.unpack(f'{len(row[1]) // 4}f', row[1]))
+        for row in conn.execute(
+            f"SELECT query, embedding FROM query_embeddings WHERE query IN ({placeholders})", unique
+        )
+    }
+
+    missing = [text for text in unique if text not in cached]
+    if missing:
+        fresh = get_embeddings(missing)
+        cached.update(zip(missing, fresh))
+        busy_timeout = conn.execute("PRAGMA busy_timeout").fetchone()[0]
+        conn.execute(f"PRAGMA busy_timeout = {QUERY_CACHE_BUSY_TIMEOUT_MS}")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO query_embeddings (query, embedding) VALUES (?, ?)",
+                [(text, struct.pack(f'{len(emb)}f', *emb)) for text, emb in zip(missing, fresh)],
+            )
+            conn.execute(
+                """DELETE FROM query_embeddings WHERE rowid NOT IN
+                   (SELECT rowid FROM query_embeddings ORDER BY rowid DESC LIMIT ?)""",
+                (QUERY_CACHE_SIZE,),
+            )
+            conn.commit()
+        except sqlite3.OperationalError:
+            conn.rollback()
+        finally:
+            conn.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+
+    return [cached[text] for text in texts]
+
+
+def _write_documents(
     conn: sqlite3.Connection,
-    doc_id: str,
-    content: str,
-    metadata: Dict[str, Any],
+    docs: List[Tuple[str, str, Dict[str, Any]]],
+    embeddings: List[List[float]],
+    replace: bool = True,
 ) -> None:
-    """Atomic upsert into learnings + vec_learnings + fts_learnings."""
+    """Replace the rows of (doc_id, content, metadata) docs in all three tables.
+
+    One executemany per statement rather than six executes per document.
+    replace=False skips deleting existing rows first, for callers that know
+    the ids aren't there (a build into empty tables). Does not commit.
+    """
     from datetime import datetime, timezone
+    import struct
 
-    embedding = get_embedding(content)
-    created_at = metadata.get('created_at', datetime.now(timezone.utc).isoformat())
+    now = datetime.now(timezone.utc).isoformat()
+    ids = [(doc_id,) for doc_id, _, _ in docs]
 
     # Delete-then-insert strategy (virtual tables don't support ON CONFLICT cleanly)
-    delete_document(conn, doc_id)
+    if replace:
+        for table in ('learnings', 'vec_learnings', 'fts_learnings'):
+            conn.executemany(f"DELETE FROM {table} WHERE id = ?", ids)
 
-    conn.execute(
+    conn.executemany(
         """INSERT INTO learnings (id, content, scope, repo, file_path, topic, keywords, created_at, access_count, last_accessed)
            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (
-            doc_id,
-            content,
-            metadata.get('scope', 'global'),
-            metadata.get('repo', ''),
-            metadata.get('file_path', ''),
-            metadata.get('topic', 'other'),
-            metadata.get('keywords', ''),
-            created_at,
-            metadata.get('access_count', 0),
-            metadata.get('last_accessed', None),
-        ),
+        [
+            (
+                doc_id,
+                content,
+                metadata.get('scope', 'global'),
+                metadata.get('repo', ''),
+                metadata.get('file_path', ''),
+                metadata.get('topic', 'other'),
+                metadata.get('keywords', ''),
+                metadata.get('created_at', now),
+                metadata.get('access_count', 0),
+                metadata.get('last_accessed', None),
+            )
+            for doc_id, content, metadata in docs
+        ],
     )
 
-    import struct
-    embedding_blob = struct.pack(f'{len(embedding)}f', *embedding)
-    conn.execute(
+    conn.executemany(
         "INSERT INTO vec_learnings (id, embedding) VALUES (?, ?)",
-        (doc_id, embedding_blob),
+        [
+            (doc_id, struct.pack(f'{len(embedding)}f', *embedding))
+            for (doc_id, _, _), embedding in zip(docs, embeddings)
+        ],
     )
 
-    conn.execute(
+    conn.executemany(
         "INSERT INTO fts_learnings (id, content) VALUES (?, ?)",
-        (doc_id, content),
+        [(doc_id, content) for doc_id, content, _ in docs],
     )
 
+
+def upsert_document(
+    conn: sqlite3.Connection,
+    doc_id: str,
+    content: str,
+    metadata: Dict[str, Any],
+) -> None:
+    """Atomic upsert into learnings + vec_learnings + fts_learnings."""
+    _write_documents(conn, [(doc_id, content, metadata)], [get_embedding(content)])
     conn.commit()
 
 
-def delete_document(conn: sqlite3.Connection, doc_id: str) -> None:
-    """Remove a document from all three tables."""
+def upsert_documents(
+    conn: sqlite3.Connection,
+    docs: List[Tuple[str, str, Dict[str, Any]]],
+    embeddings: List[List[float]] | None = None,
+    replace: bool = True,
+) -> None:
+    """Upsert a batch of (doc_id, content, metadata) in one transaction.
+
+    Embeds all contents in a single batched call (unless the caller already
+    has *embeddings* for them, in order) and commits once. On any failure the
+    whole batch is rolled back and the error re-raised, so the caller can
+    retry the documents one at a time. replace=False inserts without first
+    deleting by id; only pass it when the ids are known to be absent.
+    """
+    if not docs:
+        return
+    if embeddings is None:
+        embeddings = get_embeddings([content for _, content, _ in docs])
+    try:
+        _write_documents(conn, docs, embeddings, replace)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _delete_rows(conn: sqlite3.Connection, doc_id: str) -> None:
     conn.execute("DELETE FROM learnings WHERE id = ?", (doc_id,))
     conn.execute("DELETE FROM vec_learnings WHERE id = ?", (doc_id,))
     conn.execute("DELETE FROM fts_learnings WHERE id = ?", (doc_id,))
+
+
+def delete_document(conn: sqlite3.Connection, doc_id: str) -> None:
+    """Remove a document from all three tables."""
+    _delete_rows(conn, doc_id)
+    conn.commit()
+
+
+def delete_documents(conn: sqlite3.Connection, doc_ids: List[str]) -> None:
+    """Remove several documents from all three tables in one transaction."""
+    ids = [(doc_id,) for doc_id in doc_ids]
+    for table in ('learnings', 'vec_learnings', 'fts_learnings'):
+        conn.executemany(f"DELETE FROM {table} WHERE id = ?", ids)
+    conn.commit()
+
+
+def delete_other_ids_for_path(conn: sqlite3.Connection, file_path: str, doc_id: str) -> int:
+    """Remove rows for *file_path* stored under any id but *doc_id*.
+
+    Catches rows written under an earlier id scheme (MD5) before the file is
+    upserted under its current id, so a single-file re-index doesn't leave a
+    duplicate behind until the next full run prunes it. Does not commit.
+    Returns the number of documents removed.
+    """
+    stale = [
+        row[0] for row in conn.execute(
+            "SELECT id FROM learnings WHERE file_path = ? AND id != ?", (file_path, doc_id)
+        )
+    ]
+    for stale_id in stale:
+        _delete_rows(conn, stale_id)
+    return len(stale)
+
+
+def clear_query_embeddings(conn: sqlite3.Connection) -> None:
+    """Empty the query_embeddings cache.
+
+    A forced rebuild (e.g. after an embedding model change) must not be
+    searched with query vectors cached from the old model.
+    """
+    conn.execute("DELETE FROM query_embeddings")
     conn.commit()
 
 
@@ -263,25 +512,26 @@ def search(
     scope_repos: List[str],
     n_results: int = 10,
     threshold: float = 1.0,
+    query_embedding: List[float] | None = None,
 ) -> List[Dict[str, Any]]:
     """
     KNN vector search filtered by scope, returns list of result dicts.
 
     Each result has: id, document, metadata (dict), distance.
     scope_repos: list of repo names in scope (global always included).
+    query_embedding: query_text's embedding, if the caller already has it.
     """
     import struct
 
-    query_emb = get_embedding(query_text)
+    query_emb = query_embedding if query_embedding is not None else get_embedding(query_text)
     embedding_blob = struct.pack(f'{len(query_emb)}f', *query_emb)
 
-    # Build scope WHERE clause
-    scope_conditions = ["l.scope = 'global'"]
-    params: List[Any] = []
-    for repo in scope_repos:
-        scope_conditions.append("(l.scope = 'repo' AND l.repo = ?)")
-        params.append(repo)
-    scope_sql = ' OR '.join(scope_conditions)
+    # Build scope WHERE clause: global, or a repo learning from any in-scope repo
+    scope_sql = "l.scope = 'global'"
+    params: List[Any] = list(scope_repos)
+    if params:
+        placeholders = ', '.join('?' * len(params))
+        scope_sql += f" OR (l.scope = 'repo' AND l.repo IN ({placeholders}))"
 
     # KNN query joined with learnings for scope filtering
     # sqlite-vec returns distance as vec_distance_cosine
@@ -352,6 +602,11 @@ def get_all_documents(
     return {'ids': ids, 'documents': documents, 'metadatas': metadatas}
 
 
+def get_document_paths(conn: sqlite3.Connection) -> Dict[str, str]:
+    """Return {doc_id: file_path} for every document, without loading content."""
+    return dict(conn.execute("SELECT id, file_path FROM learnings").fetchall())
+
+
 def get_documents_by_ids(
     conn: sqlite3.Connection, ids: List[str]
 ) -> Dict[str, Any]:
@@ -11,6 +11,10 @@ sys.path.insert(0, _PLUGIN_ROOT)
 
 import lib.db as db
 
+_HITS_RE = re.compile(r'^(\*\*Hits:\*\*\s*)(\d+)', re.MULTILINE)
+_LAST_ACCESSED_RE = re.compile(r'^(\*\*Last Accessed:\*\*\s*).*$', re.MULTILINE)
+_FIELD_LINE_RE = re.compile(r'^\*\*\w[\w\s]*:\*\*.*$', re.MULTILINE)
+
 
 def record_hits(config: dict, results: list[dict], today: str | None = None) -> None:
     """Record hit counts for search results in SQLite and learning files.
@@ -62,30 +66,28 @@ def _update_file_hits(file_path: str, today: str) -> None:
 
 def _update_or_insert_hits(content: str) -> str:
     """Increment **Hits:** N by 1, or insert **Hits:** 1 after the last **Field:** line."""
-    hits_pattern = re.compile(r'^(\*\*Hits:\*\*\s*)(\d+)', re.MULTILINE)
-    match = hits_pattern.search(content)
+    match = _HITS_RE.search(content)
     if match:
+        # Splice at the match instead of re.sub, which would scan the file again
         new_count = int(match.group(2)) + 1
-        return hits_pattern.sub(rf'\g<1>{new_count}', content, count=1)
+        return content[:match.start(2)] + str(new_count) + content[match.end(2):]
 
     return _insert_field_after_last_metadata(content, '**Hits:** 1')
 
 
 def _update_or_insert_last_accessed(content: str, today: str) -> str:
     """Update **Last Accessed:** date, or insert it after the last **Field:** line."""
-    la_pattern = re.compile(r'^(\*\*Last Accessed:\*\*\s*).*$', re.MULTILINE)
-    match = la_pattern.search(content)
+    match = _LAST_ACCESSED_RE.search(content)
     if match:
-        return la_pattern.sub(rf'\g<1>{today}', content, count=1)
+        return content[:match.end(1)] + today + content[match.end():]
 
     return _insert_field_after_last_metadata(content, f'**Last Accessed:** {today}')
 
 
 def _insert_field_after_last_metadata(content: str, field_line: str) -> str:
     """Insert a field line after the last **Key:** value line in the frontmatter block."""
-    field_pattern = re.compile(r'^\*\*\w[\w\s]*:\*\*.*$', re.MULTILINE)
     last_match = None
-    for m in field_pattern.finditer(content):
+    for m in _FIELD_LINE_RE.finditer(content):
         last_match = m
 
     if last_match:
@@ -0,0 +1,38 @@
+"""
+**Field:** value parsing shared by the indexer and the maintenance scripts.
+
+Learning files carry their metadata as bold field lines near the top, e.g.
+``**Topic:** authentication`` or ``**Tags:** oauth, jwt``.
+"""
+
+from __future__ import annotations
+
+import re
+
+
+def _compile_field_re(field: str) -> re.Pattern[str]:
+    return re.compile(rf'\*\*{field}:\*\*\s*(.+?)(?:\n|$)', re.IGNORECASE)
+
+
+# Compiled once per field: building the pattern string on every call
+# defeats the re module's own cache lookup.
+_FIELD_RES: dict[str, re.Pattern[str]] = {
+    field: _compile_field_re(field)
+    for field in ('Topic', 'Tags', 'Type', 'Hits', 'Last Accessed')
+}
+
+
+def extract_field(content: str, field: str) -> str | None:
+    """Extract a **Field:** value from learning content."""
+    pattern = _FIELD_RES.get(field)
+    if pattern is None:
+        pattern = _FIELD_RES.setdefault(field, _compile_field_re(field))
+    match = pattern.search(content)
+    return match.group(1).strip() if match else None
+
+
+def decode_learning(data: bytes) -> str:
+    """Decode a learning file's raw bytes the way Path.read_text() reads it:
+    UTF-8 with universal newlines, so CRLF files parse and store like LF ones.
+    """
+    return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
@@ -21,14 +21,17 @@ from pathlib import Path
 from typing import Any, Iterable
 
 PROJECTS = Path.home() / ".claude" / "projects"
-ACK_PATTERNS = [
-    re.compile(r"found a stored learning", re.I),
-    re.compile(r"stored learning on ", re.I),
-    re.compile(r"relevant (stored )?learning", re.I),
-    re.compile(r"noting the [a-z\- ]+ (gotcha|learning|pattern)", re.I),
-]
+# One alternation, so each reply is scanned once for any acknowledgment phrasing.
+ACK_RE = re.compile(
+    r"found a stored learning"
+    r"|stored learning on "
+    r"|relevant (stored )?learning"
+    r"|noting the [a-z\- ]+ (gotcha|learning|pattern)",
+    re.I,
+)
 FILENAME_SUMMARY_RE = re.compile(r"^\s*->\s+([^:]+\.md)\s*:\s*(.*)$", re.M)
 LEARNING_BLOCK_RE = re.compile(r"^\[([a-f0-9]{32})\]\s*\n(.*?)(?=^\[[a-f0-9]{32}\]|\Z)", re.M | re.S)
+HEADING_RE = re.compile(r"^#{1,6}\s+(.+)$", re.M)
 
 
 def iter_transcript_events(path: Path) -> Iterable[dict[str, Any]]:
@@ -89,20 +92,21 @@ def assistant_text(event: dict[str, Any]) -> str:
 
 
 def score_reply(peek: dict[str, Any], reply: str) -> dict[str, bool]:
-    ack_mention = any(p.search(reply) for p in ACK_PATTERNS)
+    ack_mention = ACK_RE.search(reply) is not None
     # Substantive use: filename cited (without .md), OR any 4+ word sequence from the
     # first-line summaries / headings of the injected learnings appears in reply.
+    reply_lower = reply.lower()
     filename_hit = False
     for fname, _summary in peek["files"]:
         stem = fname.rsplit("/", 1)[-1].replace(".md", "")
-        if stem.lower() in reply.lower():
+        if stem.lower() in reply_lower:
             filename_hit = True
             break
     phrase_hit = False
     for _lid, body in peek["learnings"]:
-        for heading in re.findall(r"^#{1,6}\s+(.+)$", body, re.M)[:3]:
+        for heading in HEADING_RE.findall(body)[:3]:
             heading = heading.strip()
-            if len(heading.split()) >= 4 and heading.lower() in reply.lower():
+            if len(heading.split()) >= 4 and heading.lower() in reply_lower:
                 phrase_hit = True
                 break
         if phrase_hit:
@@ -13,6 +13,7 @@ import argparse
 import re
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Locate plugin root so lib/ is importable regardless of cwd
@@ -24,16 +25,13 @@ sys.path.insert(0, _PLUGIN_ROOT)
 
 import lib._site_packages  # noqa: F401  -- ensures site-packages on sys.path before third-party imports
 
+from lib.learning_fields import decode_learning, extract_field
 from lib.topic_mapping import infer_topic_from_tags
 
 
-def extract_field(content: str, field: str) -> str | None:
-    """Extract a **Field:** value from learning content.
-
-    Mirrors the pattern used in index-learnings.py for consistency.
-    """
-    match = re.search(rf"\*\*{field}:\*\*\s*(.+?)(?:\n|$)", content, re.IGNORECASE)
-    return match.group(1).strip() if match else None
+# Metadata fields sit at the top of a learning, so a file whose header already
+# has a topic is never read past this many bytes.
+HEADER_BYTES = 8192
 
 
 def extract_tags(content: str) -> list[str]:
@@ -77,7 +75,14 @@ def process_file(
 
     Returns (changed, topic) where changed=True means a topic was added.
     """
-    content = file_path.read_text(encoding="utf-8")
+    with open(file_path, "rb") as f:
+        head = f.read(HEADER_BYTES)
+        # A topic found in the header is the file's first one; only files
+        # without one there (almost always the ones being backfilled) are read
+        # in full.
+        if extract_field(head.decode("utf-8", errors="ignore"), "Topic"):
+            return False, None
+        content = decode_learning(head + f.read())
 
     if extract_field(content, "Topic"):
         return False, None
@@ -93,6 +98,16 @@ def process_file(
     return True, topic
 
 
+def _process_or_error(
+    file_path: Path, dry_run: bool
+) -> tuple[tuple[bool, str | None] | None, Exception | None]:
+    """process_file, returning (outcome, None) or (None, error) instead of raising."""
+    try:
+        return process_file(file_path, dry_run), None
+    except Exception as e:
+        return None, e
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Backfill missing **Topic:** fields in learning files."
@@ -139,13 +154,17 @@ def main() -> None:
     changed = 0
     skipped = 0
 
-    for file_path in files:
-        try:
-            was_changed, topic = process_file(file_path, dry_run)
-        except Exception as e:
-            print(f"  [ERROR] {file_path.name}: {e}")
+    # Files are independent, so read (and rewrite) them on a thread pool;
+    # map() keeps the report in sorted order.
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        outcomes = list(executor.map(_process_or_error, files, [dry_run] * len(files)))
+
+    for file_path, (outcome, error) in zip(files, outcomes):
+        if error is not None:
+            print(f"  [ERROR] {file_path.name}: {error}")
             continue
 
+        was_changed, topic = outcome
         if was_changed:
             changed += 1
             verb = "Would add" if dry_run else "Added"
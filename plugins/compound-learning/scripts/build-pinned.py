@@ -10,6 +10,7 @@ session start.
 """
 import argparse
 import os
+import re
 import sys
 from pathlib import Path
 
@@ -28,6 +29,12 @@ DEFAULT_OUTPUT = Path.home() / '.claude' / 'plugins' / 'compound-learning' / 'pi
 DEFAULT_TOP_N = 10
 DEFAULT_MIN_HITS = 5
 
+# A **Field:** metadata line: after any indentation it opens with ** and has
+# its closing :** within the first 40 characters.
+METADATA_LINE_RE = re.compile(r'^[^\S\n]*\*\*(?=.{0,35}:\*\*).*(?:\n|\Z)', re.MULTILINE)
+# A run of whitespace-only lines after the first one in the run.
+EXTRA_BLANK_LINES_RE = re.compile(r'^([^\S\n]*\n)(?:[^\S\n]*\n)+', re.MULTILINE)
+
 
 def build_pinned(top_n: int, min_hits: int, output: Path) -> int:
     config = db.load_config()
@@ -65,22 +72,9 @@ def build_pinned(top_n: int, min_hits: int, output: Path) -> int:
         body = row['content'].split('\n', 1)[1].strip() if '\n' in row['content'] else ''
         # Strip the **Field:** metadata lines (Type/Topic/Tags/Hits/Last Accessed
         # etc) — they're indexing signal, not actionable rule content.
-        cleaned = []
-        for line in body.split('\n'):
-            stripped = line.lstrip()
-            if stripped.startswith('**') and ':**' in stripped[:40]:
-                continue
-            cleaned.append(line)
+        cleaned = METADATA_LINE_RE.sub('', body)
         # Collapse runs of blank lines from removed metadata
-        compact = []
-        prev_blank = False
-        for line in cleaned:
-            is_blank = not line.strip()
-            if is_blank and prev_blank:
-                continue
-            compact.append(line)
-            prev_blank = is_blank
-        lines.append('\n'.join(compact).strip())
+        lines.append(EXTRA_BLANK_LINES_RE.sub(r'\1', cleaned).strip())
         lines.append("")
 
     output.write_text('\n'.join(lines), encoding='utf-8')
@@ -15,8 +15,6 @@ import lib._site_packages  # noqa: F401  -- ensures site-packages on sys.path be
 
 import json
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from pathlib import Path
 from typing import List, Dict, Any, Tuple, Set
 
 import lib.db as db
@@ -24,7 +22,7 @@ import lib.git_utils as git_utils
 
 
 # Common stopwords to filter from query keywords
-STOPWORDS = {
+STOPWORDS = frozenset({
     'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
     'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
     'should', 'may', 'might', 'must', 'shall', 'can', 'need', 'dare',
@@ -36,13 +34,28 @@ STOPWORDS = {
     'own', 'same', 'so', 'than', 'too', 'very', 'just', 'and', 'but',
     'if', 'or', 'because', 'until', 'while', 'about', 'against', 'this',
     'that', 'these', 'those', 'what', 'which', 'who', 'whom', 'its', 'it'
-}
+})
+
+
+# Upper bound on candidates fetched per keyword before falling back to a
+# full-size query (see search_learnings)
+MAX_QUERY_SIZE = 100
 
 
 # Pinned learnings are already loaded into every context via pinned.md, so peek
 # mode must not inject them a second time.
 DEFAULT_PINNED_MD_PATH = '~/.claude/plugins/compound-learning/pinned.md'
-PINNED_SOURCE_RE = re.compile(r'^_source:\s*(.+\.md)_\s*$')
+# Multiline, so one scan of pinned.md finds every source line without first
+# splitting the file into a list of lines; [ \t] keeps matches within a line.
+PINNED_SOURCE_RE = re.compile(r'^[ \t]*_source:[ \t]*(.+\.md)_[ \t\r]*$', re.MULTILINE)
+
+# Query parsing patterns, compiled once. Filters are found case-insensitively
+# but only stripped (with their trailing spacing) when written as tag:/category:.
+_TAG_RE = re.compile(r'\btag:(\w+)', re.IGNORECASE)
+_TAG_STRIP_RE = re.compile(r'\btag:\w+\s*')
+_CAT_RE = re.compile(r'\bcategory:(\w+)', re.IGNORECASE)
+_CAT_STRIP_RE = re.compile(r'\bcategory:\w+\s*')
+_WORD_RE = re.compile(r'\b\w+\b')
 
 
 def load_pinned_sources() -> Set[str]:
@@ -54,16 +67,11 @@ def load_pinned_sources() -> Set[str]:
     path = os.environ.get('COMPOUND_LEARNING_PINNED_MD') or os.path.expanduser(DEFAULT_PINNED_MD_PATH)
     try:
         with open(path, 'r', encoding='utf-8') as f:
-            lines = f.read().splitlines()
+            content = f.read()
     except OSError:
         return set()
 
-    sources: Set[str] = set()
-    for line in lines:
-        match = PINNED_SOURCE_RE.match(line.strip())
-        if match:
-            sources.add(match.group(1).strip())
-    return sources
+    return {match.group(1).strip() for match in PINNED_SOURCE_RE.finditer(content)}
 
 
 def detect_learning_hierarchy(cwd: str, home: str) -> List[str]:
@@ -74,32 +82,34 @@ def detect_learning_hierarchy(cwd: str, home: str) -> List[str]:
     """
     repos: List[str] = []
     seen: Set[str] = set()
-    home_path = Path(home)
+    # Plain strings and one stat per level: this runs on every search
+    home = os.path.normpath(home)
 
     # Resolve the real repo root first (handles worktrees)
-    real_root = Path(git_utils.resolve_repo_root(cwd))
-    real_root_learning_dir = real_root / '.projects' / 'learnings'
-    if real_root_learning_dir.exists() and real_root != home_path:
-        repo_name = real_root.name
+    real_root = os.path.normpath(git_utils.resolve_repo_root(cwd))
+    if real_root != home and os.path.exists(os.path.join(real_root, '.projects', 'learnings')):
+        repo_name = os.path.basename(real_root)
         repos.append(repo_name)
         seen.add(repo_name)
 
-    # Walk up from cwd itself for any additional .projects/learnings/ dirs
-    current = Path(cwd).resolve()
+    # Walk up from cwd itself for any additional .projects/learnings/ dirs,
+    # skipping the repo root already checked above
+    current = os.path.realpath(cwd)
     while True:
-        learning_dir = current / '.projects' / 'learnings'
-        if learning_dir.exists() and current != home_path:
-            repo_name = current.name
+        if (current != home and current != real_root
+                and os.path.exists(os.path.join(current, '.projects', 'learnings'))):
+            repo_name = os.path.basename(current)
             if repo_name not in seen:
                 repos.append(repo_name)
                 seen.add(repo_name)
 
-        if current == home_path:
+        if current == home:
             break
-        if current.parent == current:
+        parent = os.path.dirname(current)
+        if parent == current:
             break
 
-        current = current.parent
+        current = parent
 
     return repos
 
@@ -112,22 +122,22 @@ def parse_tag_filters(query: str) -> Tuple[str, Dict[str, Any]]:
     filters: Dict[str, Any] = {}
     cleaned = query
 
-    tag_matches = re.findall(r'\btag:(\w+)', query, re.IGNORECASE)
+    tag_matches = _TAG_RE.findall(query)
     if tag_matches:
         filters['tags'] = [t.lower() for t in tag_matches]
-        cleaned = re.sub(r'\btag:\w+\s*', '', cleaned)
+        cleaned = _TAG_STRIP_RE.sub('', cleaned)
 
-    cat_match = re.search(r'\bcategory:(\w+)', query, re.IGNORECASE)
+    cat_match = _CAT_RE.search(query)
     if cat_match:
         filters['category'] = cat_match.group(1).lower()
-        cleaned = re.sub(r'\bcategory:\w+\s*', '', cleaned)
+        cleaned = _CAT_STRIP_RE.sub('', cleaned)
 
     return cleaned.strip(), filters
 
 
 def extract_query_keywords(query: str) -> Set[str]:
     """Extract meaningful keywords from query, removing stopwords."""
-    tokens = re.findall(r'\b\w+\b', query.lower())
+    tokens = _WORD_RE.findall(query.lower())
     return {t for t in tokens if t not in STOPWORDS and len(t) >= 2}
 
 
@@ -143,7 +153,7 @@ def calculate_keyword_overlap(keywords: Set[str], document: str) -> float:
 def fts5_search(conn, query_text: str, limit: int = 50) -> Set[str]:
     """Return IDs of documents matching FTS5 full-text search."""
     try:
-        tokens = re.findall(r'\b\w+\b', query_text.lower())
+        tokens = _WORD_RE.findall(query_text.lower())
         meaningful = [t for t in tokens if t not in STOPWORDS and len(t) >= 2]
         if not meaningful:
             return set()
@@ -227,31 +237,44 @@ def hybrid_rerank(
     return sorted(results, key=lambda x: x['distance'])
 
 
-def query_single_keyword(
-    config: Any,
-    keyword: str,
+def search_keywords(
+    conn: Any,
+    keywords: List[str],
     scope_repos: List[str],
     query_size: int,
-) -> List[Dict[str, Any]]:
-    """Query SQLite for a single keyword. Opens its own connection (thread-safe)."""
+) -> List[List[Dict[str, Any]]]:
+    """Run one KNN query per keyword on *conn*, returning a result list per keyword.
+
+    All keywords are embedded in one batched forward pass, so a multi-keyword
+    search costs one model call and one connection rather than one of each
+    per keyword; keywords searched before come from the query embedding cache.
+    """
     try:
-        conn = db.get_connection(config)
-        try:
-            results = db.search(conn, keyword, scope_repos, n_results=query_size, threshold=1.0)
-            for r in results:
-                r['matched_keyword'] = keyword
-            return results
-        finally:
-            conn.close()
+        embeddings = db.get_query_embeddings(conn, keywords)
     except Exception as e:
-        print(f"Error in query_single_keyword: {e}", file=sys.stderr)
+        print(f"Error in search_keywords: {e}", file=sys.stderr)
         return []
 
-
-def merge_parallel_results(
+    all_results: List[List[Dict[str, Any]]] = []
+    for keyword, embedding in zip(keywords, embeddings):
+        try:
+            results = db.search(
+                conn, keyword, scope_repos, n_results=query_size, threshold=1.0,
+                query_embedding=embedding,
+            )
+        except Exception as e:
+            print(f"Error in search_keywords: {e}", file=sys.stderr)
+            continue
+        for r in results:
+            r['matched_keyword'] = keyword
+        all_results.append(results)
+    return all_results
+
+
+def merge_keyword_results(
     all_results: List[List[Dict[str, Any]]]
 ) -> List[Dict[str, Any]]:
-    """Merge results from parallel keyword queries, keeping best distance per ID."""
+    """Merge results from the per-keyword queries, keeping best distance per ID."""
     best_by_id: Dict[str, Dict[str, Any]] = {}
 
     for result_list in all_results:
@@ -293,7 +316,7 @@ def search_learnings(
         keywords = [query] if query else []
 
     if not keywords:
-        print(json.dumps({'status': 'empty', 'message': 'No keywords provided'}))
+        print(db.json_dumps({'status': 'empty', 'message': 'No keywords provided'}))
         return
 
     # Parse tag/category filters from first keyword (for compatibility)
@@ -322,31 +345,30 @@ def search_learnings(
         # pool must be wide enough for a non-pinned result to take the freed slot.
         pinned_sources = load_pinned_sources() if peek_mode else set()
 
-        query_size = max_results + len(exclude_set) + len(pinned_sources)
+        # Excluded and pinned results are dropped after retrieval, so the pool is
+        # widened to make room for them, up to a cap: most excluded IDs never rank
+        # near the top. Only if the capped pool leaves fewer than max_results
+        # usable candidates is it queried again at full size.
+        full_size = max_results + len(exclude_set) + len(pinned_sources)
+        query_size = min(full_size, max(max_results * 4, max_results + 10), MAX_QUERY_SIZE)
 
-        # Run parallel queries for each keyword; each call opens its own connection
-        all_results: List[List[Dict[str, Any]]] = []
-        with ThreadPoolExecutor(max_workers=min(len(keywords), 8)) as executor:
-            futures = {
-                executor.submit(query_single_keyword, config, kw, repos, query_size): kw
-                for kw in keywords
-            }
-            for future in as_completed(futures):
-                try:
-                    result = future.result()
-                    all_results.append(result)
-                except Exception as e:
-                    print(f"Error in search_learnings: {e}", file=sys.stderr)
-
-        # Merge results from parallel queries
-        raw_results = merge_parallel_results(all_results)
-
-        # Get FTS5 matches for additional signal
-        conn_fts = db.get_connection(config)
+        # One connection serves every keyword query and the FTS5 lookup
+        conn = db.get_connection(config)
         try:
-            fts_matches = fts5_search(conn_fts, ' '.join(keywords))
+            raw_results = merge_keyword_results(search_keywords(conn, keywords, repos, query_size))
+            if query_size < full_size:
+                usable = sum(
+                    1 for r in raw_results
+                    if r['id'] not in exclude_set
+                    and os.path.basename((r.get('metadata') or {}).get('file_path') or '') not in pinned_sources
+                )
+                if usable < max_results:
+                    raw_results = merge_keyword_results(search_keywords(conn, keywords, repos, full_size))
+
+            # Get FTS5 matches for additional signal
+            fts_matches = fts5_search(conn, ' '.join(keywords))
         finally:
-            conn_fts.close()
+            conn.close()
 
         # Apply hybrid re-ranking (keyword boost + FTS5 signal)
         reranked_results = hybrid_rerank(raw_results, query_keywords, keyword_weight, fts_ids=fts_matches)
@@ -390,7 +412,7 @@ def search_learnings(
             else:
                 output = {'status': 'empty', 'keywords_searched': keywords}
 
-            print(json.dumps(output, indent=2))
+            print(db.json_dumps(output, indent=True))
 
             if peek_results:
                 try:
@@ -429,7 +451,7 @@ def search_learnings(
                 'possibly_relevant': possibly_relevant
             }
 
-        print(json.dumps(output, indent=2))
+        print(db.json_dumps(output, indent=True))
 
     except Exception as e:
         error_output = {
@@ -437,7 +459,7 @@ def search_learnings(
             'message': str(e),
             'query': query
         }
-        print(json.dumps(error_output, indent=2))
+        print(db.json_dumps(error_output, indent=True))
         sys.exit(1)
 
 
@@ -456,7 +478,7 @@ if __name__ == '__main__':
     parser.add_argument('--max-results', type=int, default=5,
                         help='Maximum results to return')
     parser.add_argument('--keywords-json', type=str, default=None,
-                        help='JSON array of keywords to search in parallel (e.g. \'["prompt caching", "TTL"]\')')
+                        help='JSON array of keywords to search together (e.g. \'["prompt caching", "TTL"]\')')
 
     args = parser.parse_args()
     search_learnings(
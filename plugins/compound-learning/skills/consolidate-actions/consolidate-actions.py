@@ -15,7 +15,6 @@ import lib._site_packages  # noqa: F401  -- isolated site-packages on sys.path B
 
 import json
 import shutil
-import hashlib
 import argparse
 from datetime import datetime
 from typing import Dict, List, Any, Optional
@@ -55,13 +54,11 @@ def action_get(ids: List[str], config: Dict[str, Any]) -> Dict[str, Any]:
         if not results or not results.get('ids'):
             return {'status': 'error', 'message': 'No documents found for provided IDs'}
 
-        documents = []
-        for i, doc_id in enumerate(results['ids']):
-            documents.append({
-                'id': doc_id,
-                'content': results['documents'][i] if results.get('documents') else '',
-                'metadata': results['metadatas'][i] if results.get('metadatas') else {}
-            })
+        # get_documents_by_ids returns aligned lists, one entry per id
+        documents = [
+            {'id': doc_id, 'content': content, 'metadata': metadata}
+            for doc_id, content, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+        ]
 
         return {'status': 'success', 'documents': documents}
     except Exception as e:
@@ -81,8 +78,7 @@ def action_delete(ids: List[str], config: Dict[str, Any]) -> Dict[str, Any]:
             conn.close()
             return {'status': 'error', 'message': 'No documents found for provided IDs'}
 
-        for i, doc_id in enumerate(docs['ids']):
-            metadata = docs['metadatas'][i] if docs.get('metadatas') else {}
+        for doc_id, metadata in zip(docs['ids'], docs['metadatas']):
             file_path = metadata.get('file_path', '')
 
             if file_path and os.path.exists(file_path):
@@ -119,8 +115,7 @@ def action_archive(ids: List[str], config: Dict[str, Any]) -> Dict[str, Any]:
             conn.close()
             return {'status': 'error', 'message': 'No documents found for provided IDs'}
 
-        for i, doc_id in enumerate(docs['ids']):
-            metadata = docs['metadatas'][i] if docs.get('metadatas') else {}
+        for doc_id, metadata in zip(docs['ids'], docs['metadatas']):
             file_path = metadata.get('file_path', '')
 
             if file_path and os.path.exists(file_path):
@@ -200,7 +195,7 @@ def action_rescope(doc_id: str, new_scope: str, config: Dict[str, Any]) -> Dict[
         if new_scope == 'global':
             new_metadata['repo'] = ''
 
-        new_doc_id = hashlib.md5(new_file_path.encode()).hexdigest()
+        new_doc_id = db.doc_id_for_path(new_file_path)
 
         db.delete_document(conn, doc_id)
         db.upsert_document(conn, new_doc_id, content, new_metadata)
@@ -244,9 +239,7 @@ def action_merge(ids: List[str], name: str, config: Dict[str, Any],
         file_paths = []
         scopes = set()
 
-        for i, doc_id in enumerate(docs['ids']):
-            content = docs['documents'][i] if docs.get('documents') else ''
-            metadata = docs['metadatas'][i] if docs.get('metadatas') else {}
+        for content, metadata in zip(docs['documents'], docs['metadatas']):
             contents.append(content)
             metadatas.append(metadata)
             file_paths.append(metadata.get('file_path', ''))
@@ -301,8 +294,8 @@ def action_merge(ids: List[str], name: str, config: Dict[str, Any],
         merged_content += f"*Merged from {len(contents)} learnings on {date_str}*\n\n"
         merged_content += "---\n\n"
 
-        for i, content in enumerate(contents):
-            source = os.path.basename(file_paths[i]) if file_paths[i] else f"Document {i+1}"
+        for i, (content, file_path) in enumerate(zip(contents, file_paths), 1):
+            source = os.path.basename(file_path) if file_path else f"Document {i}"
             merged_content += f"## Source: {source}\n\n"
             merged_content += content.strip() + "\n\n"
             merged_content += "---\n\n"
@@ -323,8 +316,7 @@ def action_merge(ids: List[str], name: str, config: Dict[str, Any],
 
         backed_up = []
         deleted_ids = []
-        for i, doc_id in enumerate(docs['ids']):
-            file_path = file_paths[i]
+        for doc_id, file_path in zip(docs['ids'], file_paths):
             if file_path and os.path.exists(file_path):
                 backup = create_backup(file_path, archive_dir)
                 if backup:
@@ -333,7 +325,7 @@ def action_merge(ids: List[str], name: str, config: Dict[str, Any],
             db.delete_document(conn, doc_id)
             deleted_ids.append(doc_id)
 
-        merged_id = hashlib.md5(merged_path.encode()).hexdigest()
+        merged_id = db.doc_id_for_path(merged_path)
         merged_metadata = {
             'scope': merged_scope,
             'repo': metadatas[0].get('repo', '') if merged_scope == 'repo' else '',
@@ -32,8 +32,8 @@ def find_duplicate_clusters(conn, config: Dict[str, Any], limit: int = 20) -> Li
         return clusters
 
     all_ids = all_docs['ids']
-    id_to_meta = {all_ids[i]: all_docs['metadatas'][i] for i in range(len(all_ids))}
-    id_to_doc = {all_ids[i]: all_docs['documents'][i] for i in range(len(all_ids))}
+    id_to_meta = dict(zip(all_ids, all_docs['metadatas']))
+    id_to_doc = dict(zip(all_ids, all_docs['documents']))
 
     for doc_id in all_ids:
         if doc_id in seen_ids:
@@ -110,17 +110,21 @@ def find_outdated_candidates(conn, config: Dict[str, Any], limit: int = 20) -> L
     """Find learnings with outdated markers. Returns compact format."""
     outdated_keywords = config['consolidation']['outdatedKeywords']
     candidates: List[Dict[str, Any]] = []
+    if not outdated_keywords:
+        return candidates
+
+    # Lowercase the markers once, not per document. Each is checked on its own
+    # so a marker that is a prefix of another ('hack', 'hacky') still counts.
+    markers = [(kw, kw.lower()) for kw in outdated_keywords]
 
     all_docs = db.get_all_documents(conn, include_content=True)
     if not all_docs or not all_docs.get('ids'):
         return candidates
 
-    for i, doc_id in enumerate(all_docs['ids']):
-        doc_content = all_docs['documents'][i] if all_docs.get('documents') else ""
-        metadata = all_docs['metadatas'][i] if all_docs.get('metadatas') else {}
-
+    # get_all_documents returns aligned lists, one entry per id
+    for doc_id, doc_content, metadata in zip(all_docs['ids'], all_docs['documents'], all_docs['metadatas']):
         content_lower = doc_content.lower()
-        matching = [kw for kw in outdated_keywords if kw.lower() in content_lower]
+        matching = [kw for kw, kw_lower in markers if kw_lower in content_lower]
 
         if matching:
             fp = metadata.get('file_path', '')
@@ -13,50 +13,162 @@ sys.path.insert(0, _PLUGIN_ROOT)
 
 import lib._site_packages  # noqa: F401  -- put isolated site-packages on sys.path BEFORE lib.db (sqlite_vec); without it the auto-index hook fails ("No module named 'sqlite_vec'") when invoked with no manual PYTHONPATH
 
-import hashlib
+import functools
+import itertools
+import queue
 import re
+import threading
 from pathlib import Path
 from datetime import datetime, timezone
-from collections import defaultdict
-from typing import Dict, List, Tuple, Any
+from collections import Counter, defaultdict, deque
+from typing import Dict, Iterable, Iterator, List, Tuple, Any
 
 import lib.db as db
 import lib.git_utils as git_utils
+from lib.learning_fields import decode_learning, extract_field
 from lib.topic_mapping import infer_topic_from_tags, canonicalize_topic
 
+# Directory names never descended into when searching for learnings
+EXCLUDE_DIRS = frozenset({'node_modules', '.git', '.venv', 'venv', '__pycache__', 'build', 'dist'})
 
-def _rglob_follow_symlinks(root: Path, target: str) -> List[Path]:
-    """Like Path.rglob but follows symlinks (Path.rglob doesn't until Python 3.13)."""
-    results = []
-    target_parts = target.split('/')
-    for dirpath, dirnames, _ in os.walk(str(root), followlinks=True):
-        dirnames[:] = [d for d in dirnames if d not in
-                       {'node_modules', '.git', '.venv', 'venv', '__pycache__', 'build', 'dist'}]
-        p = Path(dirpath)
-        if len(p.parts) >= len(target_parts):
-            if list(p.parts[-len(target_parts):]) == target_parts:
-                results.append(p)
-    return results
+
+def _search_depth_from_env() -> int | None:
+    """Optional cap on directories below a search root the walk will descend,
+    from LEARNINGS_SEARCH_DEPTH. Unbounded (None) unless set to an integer >= 0.
+    """
+    raw = os.environ.get('LEARNINGS_SEARCH_DEPTH')
+    if not raw:
+        return None
+    try:
+        depth = int(raw)
+    except ValueError:
+        depth = -1
+    if depth < 0:
+        print(f"[WARN] Ignoring LEARNINGS_SEARCH_DEPTH={raw!r}: expected an integer >= 0", file=sys.stderr)
+        return None
+    return depth
+
+
+# Unbounded by default: a repo below any fixed depth would silently drop out of
+# the index. The link guard in _find_learnings_dirs already ends the walk.
+MAX_SEARCH_DEPTH = _search_depth_from_env()
+
+
+def _find_learnings_dirs(root: Path, max_depth: int | None = MAX_SEARCH_DEPTH) -> Iterator[str]:
+    """Yield every .projects/learnings directory under *root*.
+
+    Explicit os.scandir DFS: excluded names are pruned before descending,
+    symlinked directories are followed (Path.rglob doesn't until Python 3.13),
+    and a learnings directory is not descended into once found. A symlinked
+    directory whose target was already reached through another link is
+    skipped, so link cycles end after one lap. With *max_depth*, directories
+    deeper than that below *root* are not listed.
+    """
+    linked: set[Tuple[int, int]] = set()
+    stack = [(str(root), 0)]
+    while stack:
+        current, depth = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if not entry.is_dir() or entry.name in EXCLUDE_DIRS:
+                        continue
+                    if entry.is_symlink():
+                        st = entry.stat()
+                        if (st.st_dev, st.st_ino) in linked:
+                            continue
+                        linked.add((st.st_dev, st.st_ino))
+                except OSError:
+                    continue
+                if entry.name == 'learnings' and os.path.basename(current) == '.projects':
+                    yield entry.path
+                elif max_depth is None or depth < max_depth:
+                    stack.append((entry.path, depth + 1))
+
+
+def _iter_md_files(directory: str) -> Iterator[os.DirEntry]:
+    """Yield directory entries for *.md files under *directory*.
+
+    Like Path.rglob('*.md'), symlinked subdirectories are not followed.
+    EXCLUDE_DIRS only applies to the search for learnings directories: a
+    build/ or dist/ folder inside one holds learnings like any other.
+    """
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith('.md'):
+                        yield entry
+                except OSError:
+                    continue
+
+
+def _iter_unseen_md(directory: str, seen: set) -> Iterator[Tuple[str, os.stat_result, bool]]:
+    """Yield (path, stat, linked) for *.md files under *directory* (minus
+    MANIFEST.md) not already in *seen*.
+
+    Files are keyed by (st_dev, st_ino): one stat() per file instead of a
+    resolve() walking every parent, and hard links dedupe as well as symlinks.
+    Since nothing but the file itself can be a symlink, paths are canonical
+    whenever *directory* is, and only symlinked files get resolved. linked
+    is True for those: their canonical path may lie outside *directory*.
+    """
+    for entry in _iter_md_files(directory):
+        if entry.name == 'MANIFEST.md':
+            continue
+        try:
+            st = entry.stat()
+            linked = entry.is_symlink()
+            path = os.path.realpath(entry.path) if linked else entry.path
+        except OSError:
+            continue
+        key = (st.st_dev, st.st_ino)
+        if key not in seen:
+            seen.add(key)
+            yield path, st, linked
 
 
-def find_all_learning_files(config: Dict[str, Any]) -> Tuple[List[Path], Dict[str, List[Path]]]:
-    """Find all learning files in global and repo locations."""
-    global_dir = Path(config['learnings']['globalDir']).resolve()
+def iter_learning_files(config: Dict[str, Any]) -> Iterator[Tuple[str, str, str, os.stat_result]]:
+    """Yield (scope, repo_name, path, stat) for every learning file in global and
+    repo locations, as each one is discovered.
+
+    A generator so indexing can start on the first files while the (possibly
+    large) repo search path is still being walked. repo_name is '' for global.
+    Paths are canonical strings, not Path objects, and come with the stat()
+    taken during discovery, so callers need neither to build a Path nor to
+    stat again until they actually read a file.
+    """
+    global_dir = Path(resolved_global_dir(config))
     repo_search_path = Path(config['learnings']['repoSearchPath']).resolve()
 
-    exclude_dirs = {'node_modules', '.git', '.venv', 'venv', '__pycache__', 'build', 'dist'}
+    seen_files: set[Tuple[int, int]] = set()
+    global_prefix = str(global_dir)
 
-    global_files = []
-    repo_files_by_name: Dict[str, List[Path]] = {}
-    seen_paths: set = set()
+    def owned(scope: str, repo_name: str, path: str, linked: bool) -> Tuple[str, str]:
+        # A symlinked file belongs to wherever it really lives, not to the
+        # directory that links to it; otherwise which scope and repo it gets
+        # would depend on which directory the walk happened to reach first.
+        if linked:
+            metadata = extract_metadata_from_path(Path(path), global_prefix)
+            return metadata['scope'], metadata['repo']
+        return scope, repo_name
 
     # Global learnings
     if global_dir.exists():
-        for f in global_dir.glob('**/*.md'):
-            canonical = f.resolve()
-            if canonical not in seen_paths and canonical.name != 'MANIFEST.md':
-                seen_paths.add(canonical)
-                global_files.append(canonical)
+        for path, st, linked in _iter_unseen_md(global_prefix, seen_files):
+            yield (*owned('global', '', path, linked), path, st)
 
     # Repo learnings
     search_paths = {repo_search_path}
@@ -65,73 +177,126 @@ def find_all_learning_files(config: Dict[str, Any]) -> Tuple[List[Path], Dict[st
         if alt_search.exists():
             search_paths.add(alt_search)
 
-    for search_path in search_paths:
+    # Walk each tree once: drop roots nested inside another root (shortest
+    # first, so an ancestor is always kept before its descendants)
+    roots: List[Path] = []
+    for search_path in sorted(search_paths, key=lambda p: len(p.parts)):
+        if not any(search_path == root or root in search_path.parents for root in roots):
+            roots.append(search_path)
+
+    for search_path in roots:
         if not search_path.exists():
             continue
-        for learnings_dir in _rglob_follow_symlinks(search_path, '.projects/learnings'):
-            learnings_dir = learnings_dir.resolve()
-            if str(learnings_dir).startswith(str(global_dir)):
+        for learnings_dir in _find_learnings_dirs(search_path):
+            learnings_dir = os.path.realpath(learnings_dir)
+            if learnings_dir.startswith(global_prefix):
                 continue
-            if any(excluded in learnings_dir.parts for excluded in exclude_dirs):
+            # Walk pruning already skips these; this catches symlinks that
+            # resolve into an excluded tree.
+            if not EXCLUDE_DIRS.isdisjoint(learnings_dir.split(os.sep)):
                 continue
 
-            repo_name = git_utils.resolve_repo_name(str(learnings_dir))
-            for f in learnings_dir.glob('**/*.md'):
-                canonical = f.resolve()
-                if canonical not in seen_paths and canonical.name != 'MANIFEST.md':
-                    seen_paths.add(canonical)
-                    if repo_name not in repo_files_by_name:
-                        repo_files_by_name[repo_name] = []
-                    repo_files_by_name[repo_name].append(canonical)
+            repo_name = git_utils.resolve_repo_name(learnings_dir)
+            for path, st, linked in _iter_unseen_md(learnings_dir, seen_files):
+                yield (*owned('repo', repo_name, path, linked), path, st)
+
+
+# Learning files sit a handful to a directory, so memoise the walk up to the
+# repo root per directory rather than repeating it for every file.
+_repo_name_for_dir = functools.lru_cache(maxsize=None)(git_utils.resolve_repo_name)
+
 
-    return global_files, repo_files_by_name
+@functools.lru_cache(maxsize=8)
+def _resolve_dir(directory: str) -> str:
+    return str(Path(directory).resolve())
+
+
+def resolved_global_dir(config: Dict[str, Any]) -> str:
+    """Canonical global learnings directory, for extract_metadata_from_path.
+
+    Memoised on the configured path, so callers indexing file after file in
+    one process (e.g. the test harness) don't resolve it again for each one.
+    """
+    return _resolve_dir(config['learnings']['globalDir'])
 
 
-def extract_metadata_from_path(file_path: Path, config: Dict[str, Any]) -> Dict[str, str]:
-    """Extract scope metadata from file path."""
-    canonical_path = file_path.resolve()
+def extract_metadata_from_path(canonical_path: Path, global_dir: str) -> Dict[str, str]:
+    """Extract scope metadata from an already-resolved file path.
+
+    *global_dir* is resolved_global_dir(config), computed once by the caller.
+    """
     path_str = str(canonical_path)
-    global_dir = str(Path(config['learnings']['globalDir']).resolve())
 
     if path_str.startswith(global_dir):
         return {"scope": "global", "repo": "", "file_path": path_str}
 
-    repo_name = git_utils.resolve_repo_name(str(canonical_path.parent))
+    repo_name = _repo_name_for_dir(str(canonical_path.parent))
     return {"scope": "repo", "repo": repo_name, "file_path": path_str}
 
 
-def extract_field(content: str, field: str) -> str | None:
-    """Extract a **Field:** value from learning content."""
-    match = re.search(rf'\*\*{field}:\*\*\s*(.+?)(?:\n|$)', content, re.IGNORECASE)
-    return match.group(1).strip() if match else None
+# Every **Field:** the indexer reads, matched at one position of the content.
+_FIELD_AT_RE = re.compile(
+    r'\*\*(Topic|Tags|Type|Hits|Last Accessed|Created|Learned|Date):\*\*\s*(.+?)(?:\n|$)',
+    re.IGNORECASE,
+)
+
+
+def extract_fields(content: str) -> Dict[str, str]:
+    """Map each **Field:** the indexer reads (lowercased name) to its first value.
+
+    One pass over the content: str.find jumps between '**' markers and the
+    pattern is only tried there, rather than the regex engine attempting a
+    match at every character. Each marker is tried even when it sits inside
+    the previous field's value (which can run onto the next line), so every
+    field gets exactly what a separate extract_field() search would find.
+    """
+    fields: Dict[str, str] = {}
+    pos = content.find('**')
+    while pos != -1:
+        match = _FIELD_AT_RE.match(content, pos)
+        if match:
+            fields.setdefault(match.group(1).lower(), match.group(2).strip())
+        pos = content.find('**', pos + 1)
+    return fields
+
+
+def _topic_from(topic: str | None, tags: List[str]) -> str:
+    if topic:
+        canonical, _ = canonicalize_topic(topic)
+        return canonical or topic.lower().replace(' ', '-')
+    return infer_topic_from_tags(tags)
 
 
 def extract_topic(content: str) -> str:
     """Extract topic from **Topic:** field, canonicalize via slug + alias map,
     fallback to tag-based inference for files without an explicit topic."""
     topic = extract_field(content, 'Topic')
-    if topic:
-        canonical, _ = canonicalize_topic(topic)
-        return canonical or topic.lower().replace(' ', '-')
-    return infer_topic_from_tags(extract_tags(content))
+    return _topic_from(topic, [] if topic else extract_tags(content))
 
 
-def extract_tags(content: str) -> List[str]:
-    """Extract tags from **Tags:** field."""
-    tags_str = extract_field(content, 'Tags')
+MAX_TAGS = 8
+_TAG_RE = re.compile(r'[^,]+')
+
+
+def _tags_from(tags_str: str | None) -> List[str]:
     if tags_str:
-        return [t.strip().lower() for t in tags_str.split(',') if t.strip()][:8]
+        # Lazy split so a runaway tag line stops being scanned once the budget is met
+        tags = (m.group().strip().lower() for m in _TAG_RE.finditer(tags_str))
+        return list(itertools.islice((t for t in tags if t), MAX_TAGS))
     return []
 
 
+def extract_tags(content: str) -> List[str]:
+    """Extract tags from **Tags:** field, keeping the first MAX_TAGS."""
+    return _tags_from(extract_field(content, 'Tags'))
+
+
 def extract_type(content: str) -> str | None:
     """Extract type from **Type:** field."""
     return extract_field(content, 'Type')
 
 
-def extract_hits(content: str) -> int:
-    """Extract hit count from **Hits:** field, default 0."""
-    raw = extract_field(content, 'Hits')
+def _hits_from(raw: str | None) -> int:
     if raw:
         try:
             return int(raw)
@@ -140,6 +305,11 @@ def extract_hits(content: str) -> int:
     return 0
 
 
+def extract_hits(content: str) -> int:
+    """Extract hit count from **Hits:** field, default 0."""
+    return _hits_from(extract_field(content, 'Hits'))
+
+
 def extract_last_accessed(content: str) -> str | None:
     """Extract last accessed date from **Last Accessed:** field."""
     return extract_field(content, 'Last Accessed')
@@ -167,8 +337,12 @@ def extract_created_at(content: str, file_path: Path) -> str | None:
     date suffix (the project convention: name-YYYY-MM-DD.md), then (3) the file
     mtime. Returns an ISO-8601 string, or None to let the DB fall back to now().
     """
-    for field in ('Created', 'Learned', 'Date'):
-        raw = extract_field(content, field)
+    return _created_at_from(extract_fields(content), file_path)
+
+
+def _created_at_from(fields: Dict[str, str], file_path: Path) -> str | None:
+    for field in ('created', 'learned', 'date'):
+        raw = fields.get(field)
         if raw:
             m = _FILENAME_DATE_RE.search(raw)
             if m:
@@ -194,65 +368,258 @@ def generate_manifest(manifest_data: Dict[str, List[Dict[str, Any]]], config: Di
     global_dir.mkdir(parents=True, exist_ok=True)
     manifest_path = global_dir / 'MANIFEST.md'
 
-    lines = [
-        "# Learnings Manifest",
-        f"Generated: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}",
-        ""
-    ]
-
-    # Global section
-    global_learnings = manifest_data.get('global', [])
-    if global_learnings:
-        lines.extend(_format_section("Global Learnings", global_learnings))
+    # Sections are written to the file as they are formatted, rather than
+    # collected into one list of lines and joined at the end.
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        f.write("# Learnings Manifest\n")
+        f.write(f"Generated: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\n")
 
-    # Repo sections
-    for scope in sorted(manifest_data.keys()):
-        if scope == 'global':
-            continue
-        lines.extend(_format_section(f"Repo: {scope}", manifest_data[scope]))
+        # Global section
+        global_learnings = manifest_data.get('global', [])
+        if global_learnings:
+            _write_section(f, "Global Learnings", _aggregate_topics(global_learnings))
 
-    with open(manifest_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
+        # Repo sections
+        for scope in sorted(manifest_data.keys()):
+            if scope == 'global':
+                continue
+            _write_section(f, f"Repo: {scope}", _aggregate_topics(manifest_data[scope]))
 
     print(f"\n[OK] Generated manifest: {manifest_path}")
 
 
-def _format_section(title: str, learnings: List[Dict[str, Any]]) -> List[str]:
-    """Format a manifest section."""
-    total = len(learnings)
-    gotchas = sum(1 for l in learnings if l.get('is_gotcha'))
-
-    lines = []
-    if gotchas > 0:
-        lines.append(f"## {title} ({total} total, {gotchas} gotchas)")
-    else:
-        lines.append(f"## {title} ({total} total)")
-    lines.append("")
+def _aggregate_topics(learnings: List[Dict[str, Any]]) -> Tuple[Counter, Counter, Dict[str, Counter]]:
+    """Tally one scope's learnings in a single pass.
 
-    # Aggregate by topic
-    topics: Dict[str, Dict] = defaultdict(lambda: {'count': 0, 'keywords': defaultdict(int), 'gotchas': 0})
+    Returns (topic_counts, topic_gotchas, topic_keywords): learnings and
+    gotchas per topic, and each topic's keyword frequencies.
+    """
+    topic_counts: Counter = Counter()
+    topic_gotchas: Counter = Counter()
+    topic_keywords: Dict[str, Counter] = defaultdict(Counter)
 
     for l in learnings:
         topic = l['topic']
-        topics[topic]['count'] += 1
+        topic_counts[topic] += 1
         if l.get('is_gotcha'):
-            topics[topic]['gotchas'] += 1
-        for kw in l.get('keywords', []):
-            topics[topic]['keywords'][kw] += 1
+            topic_gotchas[topic] += 1
+        # Counter.update tallies the whole list in C
+        topic_keywords[topic].update(l.get('keywords', ()))
+
+    return topic_counts, topic_gotchas, topic_keywords
+
+
+def _write_section(f: Any, title: str, aggregated: Tuple[Counter, Counter, Dict[str, Counter]]) -> None:
+    """Write a manifest section, preceded by a blank line, from an _aggregate_topics result."""
+    topic_counts, topic_gotchas, topic_keywords = aggregated
+    total = sum(topic_counts.values())
+    gotchas = sum(topic_gotchas.values())
+
+    if gotchas > 0:
+        f.write(f"\n## {title} ({total} total, {gotchas} gotchas)\n\n")
+    else:
+        f.write(f"\n## {title} ({total} total)\n\n")
 
     # Table sorted by count
-    lines.append("| Topic | Count | Keywords |")
-    lines.append("|-------|-------|----------|")
+    f.write("| Topic | Count | Keywords |\n")
+    f.write("|-------|-------|----------|\n")
+
+    for topic, count in topic_counts.most_common():
+        kw_str = ', '.join(k for k, _ in topic_keywords[topic].most_common(6))
+        topic_gotcha_count = topic_gotchas[topic]
+        count_str = f"{count} ({topic_gotcha_count}⚠️)" if topic_gotcha_count else str(count)
+        f.write(f"| {topic} | {count_str} | {kw_str} |\n")
+
+
+def _prepare_file(
+    file_path: Path, metadata: Dict[str, Any]
+) -> Tuple[str, str, Dict[str, Any], Dict[str, Any]]:
+    """Read and parse one learning file. *file_path* must already be resolved.
+
+    *metadata* holds its scope, repo and file_path, as found during discovery
+    or by extract_metadata_from_path(); it is filled in and returned. Returns
+    (doc_id, content, metadata, manifest_entry). Pure file I/O and regex work
+    with no database access, so it is safe to run on a worker thread.
+    """
+    # read_bytes + decode skips the TextIOWrapper layer read_text goes through;
+    # decode_learning keeps its newline translation
+    content = decode_learning(file_path.read_bytes())
+
+    fields = extract_fields(content)
+
+    # Topics, tags and repo names come from a small vocabulary and are held for
+    # the whole run in manifest_data, so intern them to share one copy each.
+    keywords = [sys.intern(kw) for kw in _tags_from(fields.get('tags'))]
+    topic = sys.intern(_topic_from(fields.get('topic'), keywords))
+    learning_type = fields.get('type')
+    metadata['repo'] = sys.intern(metadata['repo'])
+
+    metadata['topic'] = topic
+    metadata['keywords'] = ','.join(keywords)
+    metadata['access_count'] = _hits_from(fields.get('hits'))
+    metadata['last_accessed'] = fields.get('last accessed')
+    created_at = _created_at_from(fields, file_path)
+    if created_at:
+        metadata['created_at'] = created_at
+
+    doc_id = db.doc_id_for_path(metadata['file_path'])
+    manifest_entry = {
+        'topic': topic,
+        'keywords': keywords,
+        'is_gotcha': learning_type and 'gotcha' in learning_type.lower(),
+    }
+    return doc_id, content, metadata, manifest_entry
+
+
+# Threads reading and parsing files ahead of the database writer. The work is
+# mostly blocking reads (the GIL is released), so size for I/O, not cores; at
+# most this many chunks are in flight, so the whole tree is never buffered.
+PREFETCH_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Files per prefetch task. Parsing a learning takes tens of microseconds, about
+# what one executor round trip costs, so each task reads and parses a run of
+# files rather than one.
+PREFETCH_CHUNK = 32
+
+
+def _prepare_chunk(
+    chunk: List[Tuple[Path, Dict[str, Any]]],
+) -> List[Tuple[Path, Tuple[str, str, Dict[str, Any], Dict[str, Any]] | Exception]]:
+    """_prepare_file each (file_path, metadata) pair, capturing per-file errors."""
+    results: List[Tuple[Path, Any]] = []
+    for file_path, metadata in chunk:
+        try:
+            results.append((file_path, _prepare_file(file_path, metadata)))
+        except Exception as e:
+            results.append((file_path, e))
+    return results
+
+
+def _iter_prepared(
+    files: Iterable[Tuple[Path, Dict[str, Any]]],
+    workers: int = PREFETCH_WORKERS,
+    chunk_size: int = PREFETCH_CHUNK,
+) -> Iterator[Tuple[Path, Tuple[str, str, Dict[str, Any], Dict[str, Any]] | Exception]]:
+    """Yield (file_path, prepared) in input order for (file_path, metadata)
+    pairs, where prepared is the _prepare_file result or the exception it
+    raised. Keeps at most *workers* chunks of *chunk_size* files being read
+    and parsed ahead of the consumer."""
+    # Imported here: concurrent.futures pulls in logging, and the --file hook
+    # path (which never prefetches) shouldn't pay for it on every save.
+    from concurrent.futures import ThreadPoolExecutor
+
+    files = iter(files)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: deque = deque()
+        while True:
+            chunk = list(itertools.islice(files, chunk_size))
+            if not chunk:
+                break
+            pending.append(executor.submit(_prepare_chunk, chunk))
+            if len(pending) > workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+# Documents per embed + commit round trip. Amortises the model forward pass and
+# the SQLite transaction (and its fsyncs) over many files.
+BATCH_SIZE = int(os.environ.get('LEARNINGS_INDEX_BATCH', '500'))
+
+
+def _flush_batch(
+    conn: Any,
+    batch: List[Tuple[Path, str, str, Dict[str, Any], Dict[str, Any]]],
+    replace: bool = True,
+) -> List[Tuple[Path, str, str, Dict[str, Any], Dict[str, Any]]]:
+    """Upsert a batch of prepared files.
+
+    Falls back to one upsert per file when the batch fails, so a single bad
+    document doesn't lose the rest. Returns the batch items that were indexed.
+    replace=False skips the per-id deletes (building into empty tables).
+    """
+    if not batch:
+        return []
+
+    try:
+        db.upsert_documents(
+            conn, [(doc_id, content, metadata) for _, doc_id, content, metadata, _ in batch],
+            replace=replace,
+        )
+        succeeded = batch
+    except Exception:
+        succeeded = []
+        for item in batch:
+            file_path, doc_id, content, metadata, _ = item
+            try:
+                db.upsert_document(conn, doc_id, content, metadata)
+                succeeded.append(item)
+            except Exception as e:
+                print(f"  [ERROR] {file_path.name}: {e}")
+    return succeeded
+
+
+# Full batches allowed to wait for the writer before the reader blocks
+WRITE_QUEUE_DEPTH = 4
+
+
+def _write_batches(
+    config: Dict[str, Any], batches: 'queue.Queue', indexed: List, replace: bool = True
+) -> None:
+    """Writer thread: embed and upsert queued batches until a None sentinel.
+
+    Opens its own connection, as SQLite connections stay on the thread that
+    made them. Indexed batch items are appended to *indexed*. Keeps draining
+    the queue even if the database can't be opened, so the producer never
+    blocks on a dead writer.
+    """
+    try:
+        conn = db.get_connection(config)
+        db.apply_bulk_pragmas(conn)
+    except Exception as e:
+        print(f"[ERROR] Failed to open database: {e}")
+        conn = None
+    try:
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            if conn is not None:
+                indexed.extend(_flush_batch(conn, batch, replace))
+                print(f"  {len(indexed)}...")
+    finally:
+        if conn is not None:
+            conn.close()
 
-    for topic, data in sorted(topics.items(), key=lambda x: x[1]['count'], reverse=True):
-        count = data['count']
-        top_kw = sorted(data['keywords'].items(), key=lambda x: x[1], reverse=True)[:6]
-        kw_str = ', '.join(k for k, _ in top_kw)
-        count_str = f"{count} ({data['gotchas']}⚠️)" if data['gotchas'] else str(count)
-        lines.append(f"| {topic} | {count_str} | {kw_str} |")
 
-    lines.append("")
-    return lines
+# Bump to discard every saved entry, e.g. when the stored metadata changes shape
+_INDEX_STATE_VERSION = 1
+
+
+def _index_state_path(config: Dict[str, Any]) -> Path:
+    """Sidecar next to the database recording what the last full index saw."""
+    return Path(config['sqlite']['dbPath'] + '.index-state.json')
+
+
+def _load_index_state(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Return {canonical_path: entry} from the last run, or {} if unusable."""
+    try:
+        state = db.json_loads(path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(state, dict) or state.get('version') != _INDEX_STATE_VERSION:
+        return {}
+    return state.get('files') or {}
+
+
+def _save_index_state(path: Path, files: Dict[str, Dict[str, Any]]) -> None:
+    """Write the sidecar atomically so an interrupted run leaves the old one intact."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        tmp_path.write_text(db.json_dumps({'version': _INDEX_STATE_VERSION, 'files': files}))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARN] Failed to save index state: {e}")
 
 
 def index_single_file(file_path: Path, config: Dict[str, Any]) -> bool:
@@ -264,21 +631,11 @@ def index_single_file(file_path: Path, config: Dict[str, Any]) -> bool:
         return False
 
     try:
-        content = file_path.read_text(encoding='utf-8')
-        metadata = extract_metadata_from_path(file_path, config)
-
-        topic = extract_topic(content)
-        keywords = extract_tags(content)
-
-        metadata['topic'] = topic
-        metadata['keywords'] = ','.join(keywords)
-        metadata['access_count'] = extract_hits(content)
-        metadata['last_accessed'] = extract_last_accessed(content)
-        created_at = extract_created_at(content, file_path)
-        if created_at:
-            metadata['created_at'] = created_at
-
-        doc_id = hashlib.md5(str(file_path.resolve()).encode()).hexdigest()
+        file_path = file_path.resolve()
+        metadata = extract_metadata_from_path(file_path, resolved_global_dir(config))
+        doc_id, content, metadata, _ = _prepare_file(file_path, metadata)
+        # Committed together with the upsert
+        db.delete_other_ids_for_path(conn, metadata['file_path'], doc_id)
         db.upsert_document(conn, doc_id, content, metadata)
         return True
     except Exception as e:
@@ -288,85 +645,147 @@ def index_single_file(file_path: Path, config: Dict[str, Any]) -> bool:
         conn.close()
 
 
-def index_learning_files():
-    """Main indexing function."""
-    print("Loading configuration...")
-    config = db.load_config()
+def index_learning_files(config: Dict[str, Any] | None = None, force: bool = False):
+    """Main indexing function.
+
+    Files whose (mtime, size) match the last run and that are still in the
+    database are not re-read or re-embedded; force=True re-indexes everything.
+    """
+    if config is None:
+        print("Loading configuration...")
+        config = db.load_config()
 
     print("Opening database...")
     try:
         conn = db.get_connection(config)
+        db.apply_bulk_pragmas(conn)
         print(f"[OK] Database ready")
     except Exception as e:
         print(f"[ERROR] Failed to open database: {e}")
         sys.exit(1)
 
-    print("\nDiscovering learning files...")
-    global_files, repo_files_by_name = find_all_learning_files(config)
-    repo_files = [f for files in repo_files_by_name.values() for f in files]
-    all_files = global_files + repo_files
+    state_path = _index_state_path(config)
+    prev_state = {} if force else _load_index_state(state_path)
+    # {doc_id: file_path}, read once for both the unchanged-file check and pruning
+    existing = db.get_document_paths(conn)
+
+    # On a fresh database there is nothing to delete, so rows are inserted
+    # without the per-id deletes. Otherwise rows are replaced in place, forced
+    # runs included: the tables are never emptied up front, so a failed run
+    # leaves the old index searchable, and rows indexed by --file from outside
+    # the search path survive (the orphan prune below keeps them).
+    replace = bool(existing)
+    if force:
+        db.clear_query_embeddings(conn)
+
+    print("\nDiscovering and indexing learning files...")
+    found = {'global': 0, 'repo': 0}
+    indexed = 0
+    unchanged = 0
+    # One slot per discovered file, in discovery order so the manifest comes
+    # out the same whether a file was skipped or re-indexed. A slot stays None
+    # if its file fails to index; otherwise it becomes the saved state entry.
+    index_state: Dict[str, Dict[str, Any] | None] = {}
+    # (mtime_ns, size) from discovery, before each read; saved once the file is indexed
+    file_stats: Dict[str, Tuple[int, int]] = {}
+
+    # Discovery already knows each file's scope and repo, so the metadata is
+    # built here rather than re-deriving it (a walk up to the repo root) per file.
+    def discovered_files() -> Iterator[Tuple[Path, Dict[str, Any]]]:
+        nonlocal unchanged
+        for scope, repo_name, path_str, st in iter_learning_files(config):
+            found[scope] += 1
+            stamp = (st.st_mtime_ns, st.st_size)
+            prev = prev_state.get(path_str)
+            if (prev and (prev['mtime_ns'], prev['size']) == stamp
+                    and db.doc_id_for_path(path_str) in existing):
+                index_state[path_str] = prev
+                unchanged += 1
+                continue
+            index_state[path_str] = None
+            file_stats[path_str] = stamp
+            yield Path(path_str), {'scope': scope, 'repo': repo_name, 'file_path': path_str}
+
+    def record_indexed(items) -> None:
+        nonlocal indexed
+        indexed += len(items)
+        for _, _, _, metadata, manifest_entry in items:
+            mtime_ns, size = file_stats.pop(metadata['file_path'])
+            index_state[metadata['file_path']] = {
+                'mtime_ns': mtime_ns,
+                'size': size,
+                'scope_key': metadata['repo'] if metadata['scope'] == 'repo' else 'global',
+                'manifest': manifest_entry,
+            }
+
+    batch: List[Tuple[Path, str, str, Dict[str, Any], Dict[str, Any]]] = []
+
+    # Full batches are embedded and written by a background thread, so this
+    # one keeps pulling prepared files (and the read-ahead pool keeps reading)
+    # while the model runs. It only blocks when WRITE_QUEUE_DEPTH batches are
+    # already waiting.
+    batches: queue.Queue = queue.Queue(maxsize=WRITE_QUEUE_DEPTH)
+    indexed_items: List[Tuple[Path, str, str, Dict[str, Any], Dict[str, Any]]] = []
+    writer = threading.Thread(
+        target=_write_batches, args=(config, batches, indexed_items, replace), daemon=True
+    )
+    writer.start()
+
+    try:
+        for file_path, prepared in _iter_prepared(discovered_files()):
+            if isinstance(prepared, Exception):
+                print(f"  [ERROR] {file_path.name}: {prepared}")
+                continue
+            doc_id, content, metadata, manifest_entry = prepared
+
+            batch.append((file_path, doc_id, content, metadata, manifest_entry))
+            if len(batch) >= BATCH_SIZE:
+                batches.put(batch)
+                batch = []
+        if batch:
+            batches.put(batch)
+    finally:
+        batches.put(None)
+        writer.join()
+    record_indexed(indexed_items)
 
-    print(f"Found {len(all_files)} files (Global: {len(global_files)}, Repos: {len(repo_files)})")
+    total_found = found['global'] + found['repo']
+    print(f"Found {total_found} files (Global: {found['global']}, Repos: {found['repo']})")
+    if unchanged:
+        print(f"[OK] Skipped {unchanged} unchanged files")
 
-    if not all_files:
+    if not total_found:
         print("\nNo learning files found. Run /compound to create some!")
         conn.close()
         return
 
-    print("\nIndexing...")
-    manifest_data: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-    indexed = 0
-
-    for file_path in all_files:
-        try:
-            content = file_path.read_text(encoding='utf-8')
-            metadata = extract_metadata_from_path(file_path, config)
-
-            topic = extract_topic(content)
-            keywords = extract_tags(content)
-            learning_type = extract_type(content)
-
-            metadata['topic'] = topic
-            metadata['keywords'] = ','.join(keywords)
-            metadata['access_count'] = extract_hits(content)
-            metadata['last_accessed'] = extract_last_accessed(content)
-            created_at = extract_created_at(content, file_path)
-            if created_at:
-                metadata['created_at'] = created_at
-
-            doc_id = hashlib.md5(str(file_path.resolve()).encode()).hexdigest()
-            db.upsert_document(conn, doc_id, content, metadata)
-
-            scope_key = metadata['repo'] if metadata['scope'] == 'repo' else 'global'
-            manifest_data[scope_key].append({
-                'topic': topic,
-                'keywords': keywords,
-                'is_gotcha': learning_type and 'gotcha' in learning_type.lower(),
-            })
-
-            indexed += 1
-            if indexed % 10 == 0:
-                print(f"  {indexed}/{len(all_files)}...")
-
-        except Exception as e:
-            print(f"  [ERROR] {file_path.name}: {e}")
-
-    # Prune orphaned entries whose files no longer exist on disk
-    all_docs = db.get_all_documents(conn, include_content=False)
-    pruned = 0
-    for doc_id, metadata in zip(all_docs['ids'], all_docs['metadatas']):
-        file_path_str = metadata.get('file_path', '')
-        if file_path_str and not os.path.exists(file_path_str):
-            db.delete_document(conn, doc_id)
-            pruned += 1
-    if pruned:
-        print(f"[OK] Pruned {pruned} orphaned entries")
+    # Prune orphaned entries whose files no longer exist on disk, and rows
+    # keyed by an older id scheme (MD5) whose file was just re-indexed under
+    # its current id. Rows written by this run are neither, so the snapshot
+    # taken before indexing is enough. Files discovery just saw are known to
+    # exist; only rows outside it (e.g. indexed by --file from a repo outside
+    # the search path) cost a stat.
+    orphans = []
+    for doc_id, file_path_str in existing.items():
+        if file_path_str and (doc_id != db.doc_id_for_path(file_path_str)
+                              or (file_path_str not in index_state
+                                  and not os.path.exists(file_path_str))):
+            orphans.append(doc_id)
+    if orphans:
+        db.delete_documents(conn, orphans)
+        print(f"[OK] Pruned {len(orphans)} orphaned entries")
     else:
         print("[OK] No orphaned entries found")
 
     conn.close()
+    index_state = {path: entry for path, entry in index_state.items() if entry}
+    _save_index_state(state_path, index_state)
     print(f"\n[OK] Indexed {indexed} files")
 
+    manifest_data: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for entry in index_state.values():
+        manifest_data[entry['scope_key']].append(entry['manifest'])
+
     if manifest_data:
         generate_manifest(manifest_data, config)
 
@@ -375,10 +794,11 @@ if __name__ == '__main__':
     import argparse
     parser = argparse.ArgumentParser(description='Index learning files into SQLite')
     parser.add_argument('--file', metavar='PATH', help='Index a single file instead of all learnings')
+    parser.add_argument('--force', action='store_true', help='Re-index files even if unchanged since the last run')
     args = parser.parse_args()
+    config = db.load_config()
 
     if args.file:
-        config = db.load_config()
         file_path = Path(args.file).expanduser().resolve()
         if not file_path.exists():
             print(f"[ERROR] File not found: {file_path}")
@@ -386,4 +806,4 @@ if __name__ == '__main__':
         success = index_single_file(file_path, config)
         sys.exit(0 if success else 1)
     else:
-        index_learning_files()
+        index_learning_files(config, force=args.force)
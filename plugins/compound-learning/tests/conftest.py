@@ -75,14 +75,38 @@ def _make_config(db_path: str, learnings_dir: str, tmp_dir: str) -> Dict[str, An
     }
 
 
+# Test databases are discarded at teardown, so their connections skip crash
+# safety: no fsync per commit and no rollback journal file on disk.
+TEST_PRAGMAS = (
+    "PRAGMA synchronous=OFF",
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+@pytest.fixture(scope="session")
+def schema_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """An empty database at the current schema version, created once per session.
+
+    get_connection skips the DDL for a database already at SCHEMA_VERSION, so
+    copying this file is cheaper than re-creating the vec0/fts5 tables per test.
+    """
+    path = tmp_path_factory.mktemp("schema_template") / "template.db"
+    db.get_connection({"sqlite": {"dbPath": str(path)}}).close()
+    return path
+
+
 @pytest.fixture()
 def isolated_db(
-    tmp_path: Path, embedding_model: Any
+    tmp_path: Path, embedding_model: Any, schema_template: Path
 ) -> Tuple[Dict[str, Any], Any]:
     """Fresh SQLite DB in tmp_path. Returns (config, conn)."""
     db_path = str(tmp_path / "test-compound-learning.db")
+    shutil.copyfile(schema_template, db_path)
     config = _make_config(db_path, str(tmp_path / "learnings"), str(tmp_path))
     conn = db.get_connection(config)
+    for pragma in TEST_PRAGMAS:
+        conn.execute(pragma)
     yield config, conn
     conn.close()
 
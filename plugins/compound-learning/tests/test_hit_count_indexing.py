@@ -4,7 +4,6 @@ Tests for hit count schema migration, upsert, increment, and indexer integration
 Uses real SQLite (no mocks for internal modules).
 """
 
-import hashlib
 import importlib.util
 import sys
 from pathlib import Path
@@ -196,7 +195,7 @@ def test_indexer_reads_hits_from_file(tmp_path, embedding_model):
 
     conn = db.get_connection(config)
     try:
-        doc_id = hashlib.md5(str(learning_file.resolve()).encode()).hexdigest()
+        doc_id = db.doc_id_for_path(str(learning_file.resolve()))
         row = conn.execute(
             "SELECT access_count, last_accessed FROM learnings WHERE id = ?",
             (doc_id,),
@@ -0,0 +1,309 @@
+"""
+Tests for index-learnings: discovering learning files under the global and
+repo search paths, and writing them through the bulk and single-file paths.
+
+Uses a real directory tree under tmp_path and real SQLite (no mocks for
+internal modules).
+"""
+
+import hashlib
+import importlib.util
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+import pytest
+
+PLUGIN_ROOT = str(Path(__file__).parent.parent)
+sys.path.insert(0, PLUGIN_ROOT)
+
+import lib.db as db
+
+_idx_spec = importlib.util.spec_from_file_location(
+    "index_learnings",
+    Path(PLUGIN_ROOT) / "skills" / "index-learnings" / "index-learnings.py",
+)
+_idx_mod = importlib.util.module_from_spec(_idx_spec)
+_idx_spec.loader.exec_module(_idx_mod)
+
+index_single_file = _idx_mod.index_single_file
+iter_learning_files = _idx_mod.iter_learning_files
+
+
+# ---------------------------------------------------------------------------
+# Discovery
+# ---------------------------------------------------------------------------
+
+LEARNING = "# Learning\n\n**Topic:** testing\n**Tags:** test\n\nBody.\n"
+
+
+@pytest.fixture()
+def home(tmp_path: Path) -> Path:
+    """A search root holding the global learnings dir and one repo, repoA."""
+    home = tmp_path / "home"
+    (home / ".projects" / "learnings").mkdir(parents=True)
+    _make_repo(home / "code" / "repoA")
+    return home
+
+
+def _make_repo(root: Path) -> Path:
+    (root / ".git").mkdir(parents=True)
+    learnings = root / ".projects" / "learnings"
+    learnings.mkdir(parents=True)
+    return learnings
+
+
+def _write(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(LEARNING, encoding="utf-8")
+    return path
+
+
+def _config(home: Path) -> Dict[str, Any]:
+    return {
+        "sqlite": {"dbPath": str(home.parent / "learnings.db")},
+        "learnings": {
+            "globalDir": str(home / ".projects" / "learnings"),
+            "repoSearchPath": str(home),
+        },
+    }
+
+
+def _discover(home: Path) -> Dict[str, Tuple[str, str]]:
+    """Map each discovered file, relative to *home*, to its (scope, repo)."""
+    root = os.path.realpath(home)
+    return {
+        os.path.relpath(path, root): (scope, repo)
+        for scope, repo, path, _ in iter_learning_files(_config(home))
+    }
+
+
+def test_discovers_global_and_repo_learnings(home):
+    _write(home / ".projects" / "learnings" / "g1.md")
+    _write(home / ".projects" / "learnings" / "MANIFEST.md")
+    _write(home / "code" / "repoA" / ".projects" / "learnings" / "a1.md")
+    _write(home / "code" / "repoA" / ".projects" / "learnings" / "sub" / "a2.md")
+
+    assert _discover(home) == {
+        ".projects/learnings/g1.md": ("global", ""),
+        "code/repoA/.projects/learnings/a1.md": ("repo", "repoA"),
+        "code/repoA/.projects/learnings/sub/a2.md": ("repo", "repoA"),
+    }
+
+
+def test_excluded_trees_are_not_searched_for_learnings(home):
+    _write(home / "code" / "repoA" / ".projects" / "learnings" / "a1.md")
+    _write(home / "node_modules" / "pkg" / ".projects" / "learnings" / "n1.md")
+    _write(home / "code" / "repoA" / "build" / ".projects" / "learnings" / "b1.md")
+
+    assert _discover(home) == {"code/repoA/.projects/learnings/a1.md": ("repo", "repoA")}
+
+
+def test_excluded_names_inside_a_learnings_dir_are_still_indexed(home):
+    _write(home / ".projects" / "learnings" / "build" / "g1.md")
+    _write(home / "code" / "repoA" / ".projects" / "learnings" / "dist" / "a1.md")
+
+    assert _discover(home) == {
+        ".projects/learnings/build/g1.md": ("global", ""),
+        "code/repoA/.projects/learnings/dist/a1.md": ("repo", "repoA"),
+    }
+
+
+def test_deeply_nested_repo_is_discovered(home):
+    deep = home.joinpath("code", *[f"level{i}" for i in range(12)], "repoD")
+    _write(_make_repo(deep) / "d1.md")
+
+    assert list(_discover(home).values()) == [("repo", "repoD")]
+
+
+def test_invalid_search_depth_falls_back_to_unbounded(monkeypatch, capsys):
+    monkeypatch.setenv("LEARNINGS_SEARCH_DEPTH", "deep")
+    assert _idx_mod._search_depth_from_env() is None
+    assert "[WARN]" in capsys.readouterr().err
+
+    monkeypatch.setenv("LEARNINGS_SEARCH_DEPTH", "3")
+    assert _idx_mod._search_depth_from_env() == 3
+
+
+def test_file_reached_through_two_paths_is_discovered_once(home):
+    g1 = _write(home / ".projects" / "learnings" / "g1.md")
+    repo_learnings = home / "code" / "repoA" / ".projects" / "learnings"
+    os.symlink(g1, repo_learnings / "g1-link.md")
+    os.link(g1, repo_learnings / "g1-hardlink.md")
+
+    assert _discover(home) == {".projects/learnings/g1.md": ("global", "")}
+
+
+@pytest.mark.parametrize("link_repo", ["repoB", "repoZ"])
+def test_symlinked_file_belongs_to_the_repo_it_lives_in(home, link_repo):
+    """Attribution follows the link target, whichever repo the walk reaches first."""
+    a1 = _write(home / "code" / "repoA" / ".projects" / "learnings" / "a1.md")
+    linking = _make_repo(home / "code" / link_repo)
+    os.symlink(a1, linking / "a1-link.md")
+
+    assert _discover(home) == {"code/repoA/.projects/learnings/a1.md": ("repo", "repoA")}
+
+
+def test_symlinked_directory_cycle_terminates(home):
+    _write(home / "code" / "repoA" / ".projects" / "learnings" / "a1.md")
+    os.symlink(home / "code", home / "code" / "repoA" / "loop")
+
+    assert _discover(home) == {"code/repoA/.projects/learnings/a1.md": ("repo", "repoA")}
+
+
+
+# ---------------------------------------------------------------------------
+# Indexing
+# ---------------------------------------------------------------------------
+
+def _rows(config: Dict[str, Any], sql: str, params: Tuple = ()) -> list:
+    """Run *sql* against the database in *config* and return every row."""
+    conn = db.get_connection(config)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def test_upsert_documents_batch_writes_all_tables(isolated_db):
+    _, conn = isolated_db
+    db.upsert_documents(
+        conn,
+        [
+            (
+                f"doc-batch-{i}",
+                f"batch content number {i}",
+                {
+                    "scope": "global",
+                    "repo": "",
+                    "file_path": f"/tmp/batch-{i}.md",
+                    "topic": "testing",
+                    "keywords": "test",
+                    "access_count": i,
+                },
+            )
+            for i in range(3)
+        ],
+    )
+    for i in range(3):
+        doc_id = f"doc-batch-{i}"
+        row = conn.execute("SELECT access_count FROM learnings WHERE id = ?", (doc_id,)).fetchone()
+        assert row["access_count"] == i
+        assert conn.execute("SELECT COUNT(*) FROM vec_learnings WHERE id = ?", (doc_id,)).fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM fts_learnings WHERE id = ?", (doc_id,)).fetchone()[0] == 1
+
+
+def test_full_index_skips_unchanged_files(home, embedding_model, capsys):
+    learning_file = _write(home / ".projects" / "learnings" / "g1.md")
+    config = _config(home)
+
+    _idx_mod.index_learning_files(config)
+    assert "[OK] Indexed 1 files" in capsys.readouterr().out
+
+    _idx_mod.index_learning_files(config)
+    out = capsys.readouterr().out
+    assert "Skipped 1 unchanged files" in out
+    assert "[OK] Indexed 0 files" in out
+
+    learning_file.write_text(LEARNING + "Edited.\n", encoding="utf-8")
+    _idx_mod.index_learning_files(config)
+    assert "[OK] Indexed 1 files" in capsys.readouterr().out
+    assert _rows(config, "SELECT COUNT(*) FROM learnings")[0][0] == 1
+
+
+def test_index_single_file_replaces_row_under_old_id(home, embedding_model):
+    learning_file = _write(home / ".projects" / "learnings" / "g1.md")
+    config = _config(home)
+
+    # A row left by the old MD5 id scheme for the same file
+    file_path = str(learning_file.resolve())
+    old_id = hashlib.md5(file_path.encode()).hexdigest()
+    conn = db.get_connection(config)
+    try:
+        db.upsert_document(conn, old_id, "Body.", {"scope": "global", "file_path": file_path})
+    finally:
+        conn.close()
+
+    assert index_single_file(learning_file, config) is True
+
+    assert [row["id"] for row in _rows(config, "SELECT id FROM learnings")] == [
+        db.doc_id_for_path(file_path)
+    ]
+    assert _rows(config, "SELECT COUNT(*) FROM vec_learnings WHERE id = ?", (old_id,))[0][0] == 0
+
+
+def test_crlf_learning_is_stored_with_lf_newlines(home, embedding_model):
+    learning_file = home / ".projects" / "learnings" / "crlf.md"
+    learning_file.write_bytes(LEARNING.replace("\n", "\r\n").encode("utf-8"))
+
+    assert index_single_file(learning_file, _config(home)) is True
+
+    [row] = _rows(_config(home), "SELECT content, topic, keywords FROM learnings")
+    assert "\r" not in row["content"]
+    assert row["topic"] == "testing"
+    assert row["keywords"] == "test"
+
+
+def test_forced_index_keeps_rows_indexed_from_outside_the_search_path(home, embedding_model):
+    g1 = _write(home / ".projects" / "learnings" / "g1.md")
+    outside = _write(_make_repo(home.parent / "elsewhere" / "repoX") / "x1.md")
+    config = _config(home)
+    _idx_mod.index_learning_files(config)
+    assert index_single_file(outside, config) is True
+
+    _idx_mod.index_learning_files(config, force=True)
+
+    assert {row["file_path"] for row in _rows(config, "SELECT file_path FROM learnings")} == {
+        str(g1.resolve()),
+        str(outside.resolve()),
+    }
+
+
+def test_query_embeddings_are_cached(isolated_db):
+    _, conn = isolated_db
+    texts = ["token refresh", "lock file", "token refresh"]
+    expected = db.get_embeddings(["token refresh", "lock file"])
+
+    first = db.get_query_embeddings(conn, texts)
+    assert conn.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()[0] == 2
+    second = db.get_query_embeddings(conn, texts)
+
+    for got in (first, second):
+        assert len(got) == 3
+        assert got[0] == pytest.approx(expected[0], abs=1e-6)
+        assert got[1] == pytest.approx(expected[1], abs=1e-6)
+        assert got[2] == got[0]
+
+
+def test_query_embedding_cache_does_not_wait_for_the_write_lock(isolated_db):
+    config, conn = isolated_db
+    indexer = db.get_connection(config)
+    try:
+        indexer.execute("BEGIN IMMEDIATE")
+        start = time.monotonic()
+        embeddings = db.get_query_embeddings(conn, ["token refresh"])
+        elapsed = time.monotonic() - start
+    finally:
+        indexer.rollback()
+        indexer.close()
+
+    assert len(embeddings) == 1
+    assert elapsed < 1
+    assert conn.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()[0] == 0
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+
+def test_forced_index_drops_cached_query_embeddings(home, embedding_model):
+    _write(home / ".projects" / "learnings" / "g1.md")
+    config = _config(home)
+    conn = db.get_connection(config)
+    try:
+        db.get_query_embeddings(conn, ["token refresh"])
+    finally:
+        conn.close()
+
+    _idx_mod.index_learning_files(config, force=True)
+
+    assert _rows(config, "SELECT COUNT(*) FROM query_embeddings")[0][0] == 0
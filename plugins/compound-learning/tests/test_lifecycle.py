@@ -125,6 +125,24 @@ def test_consolidation_discovery_runs_without_error(indexed_corpus):
     assert isinstance(outdated, list), "find_outdated_candidates must return a list"
 
 
+def test_outdated_markers_include_prefixes_of_other_markers(isolated_db):
+    """A marker that is a prefix of another ('hack' / 'hacky') is still reported."""
+    config, conn = isolated_db
+    db.upsert_document(conn, "outdated-1", "A hacky fix; remove later once upstream ships.", {
+        "scope": "global", "repo": "", "file_path": "/tmp/outdated-1.md",
+        "topic": "testing", "keywords": "",
+    })
+    consol_config = {
+        **config,
+        "consolidation": {"outdatedKeywords": ["hack", "hacky", "remove later", "remove"]},
+    }
+
+    outdated = find_outdated_candidates(conn, consol_config)
+
+    assert [c["id"] for c in outdated] == ["outdated-1"]
+    assert outdated[0]["markers"] == ["hack", "hacky"]
+
+
 # ---------------------------------------------------------------------------
 # Test 5: Search scope filtering
 # ---------------------------------------------------------------------------
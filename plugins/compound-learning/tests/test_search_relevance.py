@@ -7,14 +7,9 @@ No internal modules are mocked.
 """
 
 import json
-import os
 import sys
-import tempfile
-import uuid
 from pathlib import Path
-from typing import Any, Dict, List, Set
-
-import pytest
+from typing import Any, Dict, List, Tuple
 
 # Ensure plugin root is on path so lib/ and scripts/ are importable
 PLUGIN_ROOT = str(Path(__file__).parent.parent)
@@ -44,43 +39,39 @@ search_learnings = _search_mod.search_learnings
 # Fixtures
 # ---------------------------------------------------------------------------
 
-@pytest.fixture(scope="module")
-def embedding_model():
-    """Warm up the embedding model once per test module."""
-    # Trigger lazy load
-    db.get_embedding("warmup")
-    yield
+# The embedding model and per-test database come from conftest.py: the model
+# is warmed once per session and isolated_db gives each test a fresh SQLite
+# file, which search_learnings reopens by path.
 
 
-@pytest.fixture()
-def tmp_db(tmp_path, embedding_model):
-    """
-    Isolated SQLite database in a temporary directory.
-    Returns (config, conn) tuple. Caller is responsible for conn.close().
-    """
-    db_path = str(tmp_path / "test-compound-learning.db")
-    config = {
-        "sqlite": {"dbPath": db_path},
-        "learnings": {
-            "globalDir": str(tmp_path / "learnings"),
-            "repoSearchPath": str(tmp_path),
-            "highConfidenceThreshold": 0.40,
-            "possiblyRelevantThreshold": 0.55,
-            "keywordBoostWeight": 0.65,
-        },
-    }
-    conn = db.get_connection(config)
-    yield config, conn
-    conn.close()
+def _metadata(scope: str = "global", file_path: str = "") -> Dict[str, Any]:
+    return {"scope": scope, "repo": "", "file_path": file_path, "topic": "other", "keywords": ""}
+
+
+# Real embeddings keyed by content. Most tests re-seed the same fixed corpus,
+# so each distinct text goes through the model once per session.
+_EMBEDDINGS: Dict[str, List[float]] = {}
+
+
+def _embed(contents: List[str]) -> List[List[float]]:
+    missing = [c for c in dict.fromkeys(contents) if c not in _EMBEDDINGS]
+    if missing:
+        _EMBEDDINGS.update(zip(missing, db.get_embeddings(missing)))
+    return [_EMBEDDINGS[c] for c in contents]
 
 
 def _insert(conn: Any, doc_id: str, content: str, scope: str = "global", file_path: str = "") -> None:
-    """Insert a document through the real indexing pipeline (get_embedding + upsert)."""
-    db.upsert_document(
+    """Insert a document through the real indexing pipeline (embedding + upsert)."""
+    db.upsert_documents(conn, [(doc_id, content, _metadata(scope, file_path))], _embed([content]))
+
+
+def _insert_many(conn: Any, docs: List[Tuple[str, str]], file_paths: List[str] | None = None) -> None:
+    """Insert (doc_id, content) pairs through the batch pipeline: one embedding call, one commit."""
+    paths = file_paths or [""] * len(docs)
+    db.upsert_documents(
         conn,
-        doc_id,
-        content,
-        {"scope": scope, "repo": "", "file_path": file_path, "topic": "other", "keywords": ""},
+        [(doc_id, content, _metadata(file_path=path)) for (doc_id, content), path in zip(docs, paths)],
+        _embed([content for _, content in docs]),
     )
 
 
@@ -115,8 +106,14 @@ def _full_search(
         if r.get("keyword_overlap", 0) > 0 or r.get("original_distance", 1.0) < 0.25
     ]
 
-    high_confidence = [r for r in reranked if r["distance"] < high_threshold]
-    possibly_relevant = [r for r in reranked if high_threshold <= r["distance"] < possible_threshold]
+    # Tier split in one pass (mirrors search-learnings.py)
+    high_confidence: List[Dict[str, Any]] = []
+    possibly_relevant: List[Dict[str, Any]] = []
+    for r in reranked:
+        if r["distance"] < high_threshold:
+            high_confidence.append(r)
+        elif r["distance"] < possible_threshold:
+            possibly_relevant.append(r)
 
     if peek:
         max_results = 5
@@ -186,16 +183,13 @@ COMMAND_LEARNING = (
 # Test 1: Relevant results ranked above irrelevant
 # ---------------------------------------------------------------------------
 
-def test_relevant_results_ranked_above_irrelevant(tmp_db):
+def test_relevant_results_ranked_above_irrelevant(isolated_db):
     """
     Search 'slash command pdf layout' must return the PDF learning and must
     exclude the Grafana learning (different topic, zero keyword overlap with query).
     """
-    config, conn = tmp_db
-    _insert(conn, *PDF_LEARNING)
-    _insert(conn, *GRAFANA_LEARNING)
-    _insert(conn, *PYTHON_ASYNC_LEARNING)
-    _insert(conn, *REACT_TESTING_LEARNING)
+    config, conn = isolated_db
+    _insert_many(conn, [PDF_LEARNING, GRAFANA_LEARNING, PYTHON_ASYNC_LEARNING, REACT_TESTING_LEARNING])
 
     results = _full_search(config, conn, "slash command pdf layout")
     all_ids = {r["id"] for r in results["all_results"]}
@@ -212,13 +206,12 @@ def test_relevant_results_ranked_above_irrelevant(tmp_db):
 # Test 2: High confidence threshold filters weak matches
 # ---------------------------------------------------------------------------
 
-def test_high_confidence_threshold_filters_weak_matches(tmp_db):
+def test_high_confidence_threshold_filters_weak_matches(isolated_db):
     """
     All results in high_confidence bucket must have adjusted distance < 0.40.
     """
-    config, conn = tmp_db
-    for doc_id, content in [PDF_LEARNING, PYTHON_ASYNC_LEARNING, REACT_TESTING_LEARNING]:
-        _insert(conn, doc_id, content)
+    config, conn = isolated_db
+    _insert_many(conn, [PDF_LEARNING, PYTHON_ASYNC_LEARNING, REACT_TESTING_LEARNING])
 
     results = _full_search(config, conn, "slash command pdf layout")
     high_confidence = results["high_confidence"]
@@ -233,13 +226,12 @@ def test_high_confidence_threshold_filters_weak_matches(tmp_db):
 # Test 3: Possibly relevant threshold boundary
 # ---------------------------------------------------------------------------
 
-def test_possibly_relevant_threshold_boundary(tmp_db):
+def test_possibly_relevant_threshold_boundary(isolated_db):
     """
     Results in possibly_relevant bucket must have distance in [0.40, 0.55).
     """
-    config, conn = tmp_db
-    for doc_id, content in [PDF_LEARNING, PYTHON_ASYNC_LEARNING, REACT_TESTING_LEARNING, COMMAND_LEARNING]:
-        _insert(conn, doc_id, content)
+    config, conn = isolated_db
+    _insert_many(conn, [PDF_LEARNING, PYTHON_ASYNC_LEARNING, REACT_TESTING_LEARNING, COMMAND_LEARNING])
 
     results = _full_search(config, conn, "pdf command slash")
     possibly_relevant = results["possibly_relevant"]
@@ -254,7 +246,7 @@ def test_possibly_relevant_threshold_boundary(tmp_db):
 # Test 4: Keyword overlap floor removes zero-overlap results
 # ---------------------------------------------------------------------------
 
-def test_keyword_overlap_floor_removes_zero_overlap(tmp_db):
+def test_keyword_overlap_floor_removes_zero_overlap(isolated_db):
     """
     A document with moderate semantic similarity but zero keyword overlap should
     be excluded from results (unless original_distance < 0.25, which is the escape hatch).
@@ -262,9 +254,8 @@ def test_keyword_overlap_floor_removes_zero_overlap(tmp_db):
     We verify: after filtering, no result has keyword_overlap == 0 AND
     original_distance >= 0.25.
     """
-    config, conn = tmp_db
-    for doc_id, content in [PDF_LEARNING, GRAFANA_LEARNING, PYTHON_ASYNC_LEARNING, REACT_TESTING_LEARNING]:
-        _insert(conn, doc_id, content)
+    config, conn = isolated_db
+    _insert_many(conn, [PDF_LEARNING, GRAFANA_LEARNING, PYTHON_ASYNC_LEARNING, REACT_TESTING_LEARNING])
 
     results = _full_search(config, conn, "slash command pdf layout")
 
@@ -284,12 +275,12 @@ def test_keyword_overlap_floor_removes_zero_overlap(tmp_db):
 # Test 5: Keyword boost improves ranking
 # ---------------------------------------------------------------------------
 
-def test_keyword_boost_improves_ranking(tmp_db):
+def test_keyword_boost_improves_ranking(isolated_db):
     """
     When two results have similar semantic distance, the one with keyword overlap
     should rank higher (lower adjusted distance) after hybrid_rerank.
     """
-    config, conn = tmp_db
+    config, conn = isolated_db
 
     # Two documents that are semantically similar to the query
     kw_overlap_doc_id = "kw-overlap-doc"
@@ -303,8 +294,7 @@ def test_keyword_boost_improves_ranking(tmp_db):
         "tools help organize visual structures and export options efficiently."
     )
 
-    _insert(conn, kw_overlap_doc_id, kw_overlap_content)
-    _insert(conn, no_overlap_doc_id, no_overlap_content)
+    _insert_many(conn, [(kw_overlap_doc_id, kw_overlap_content), (no_overlap_doc_id, no_overlap_content)])
 
     query = "slash command pdf layout"
     query_keywords = extract_query_keywords(query)
@@ -313,8 +303,9 @@ def test_keyword_boost_improves_ranking(tmp_db):
     raw = _search_raw(config, conn, query, n=20)
     reranked = hybrid_rerank(raw, query_keywords, keyword_weight, fts_ids=set())
 
-    kw_result = next((r for r in reranked if r["id"] == kw_overlap_doc_id), None)
-    no_kw_result = next((r for r in reranked if r["id"] == no_overlap_doc_id), None)
+    by_id = {r["id"]: r for r in reranked}
+    kw_result = by_id.get(kw_overlap_doc_id)
+    no_kw_result = by_id.get(no_overlap_doc_id)
 
     assert kw_result is not None, "keyword-overlap doc not found in results"
 
@@ -334,13 +325,13 @@ def test_keyword_boost_improves_ranking(tmp_db):
 # Test 6: FTS5 boost helps stemmed matches
 # ---------------------------------------------------------------------------
 
-def test_fts5_boost_helps_stemmed_matches(tmp_db):
+def test_fts5_boost_helps_stemmed_matches(isolated_db):
     """
     Search "commanding" should match a document containing "command" via FTS5
     Porter stemming. The matched document should have fts_match=True and a
     lower distance than it would without the FTS5 boost.
     """
-    config, conn = tmp_db
+    config, conn = isolated_db
 
     stem_doc_id = "stem-command-doc"
     stem_doc_content = (
@@ -363,7 +354,7 @@ def test_fts5_boost_helps_stemmed_matches(tmp_db):
     keyword_weight = config["learnings"]["keywordBoostWeight"]
     raw = _search_raw(config, conn, query, n=20)
 
-    stem_raw = next((r for r in raw if r["id"] == stem_doc_id), None)
+    stem_raw = {r["id"]: r for r in raw}.get(stem_doc_id)
     assert stem_raw is not None, "stem doc not found in raw KNN results"
     original_distance = stem_raw["distance"]
 
@@ -376,8 +367,8 @@ def test_fts5_boost_helps_stemmed_matches(tmp_db):
         [dict(r) for r in raw], query_keywords, keyword_weight, fts_ids=None
     )
 
-    with_fts = next((r for r in reranked_with_fts if r["id"] == stem_doc_id), None)
-    without_fts = next((r for r in reranked_without_fts if r["id"] == stem_doc_id), None)
+    with_fts = {r["id"]: r for r in reranked_with_fts}.get(stem_doc_id)
+    without_fts = {r["id"]: r for r in reranked_without_fts}.get(stem_doc_id)
 
     assert with_fts is not None
     assert without_fts is not None
@@ -396,7 +387,7 @@ def test_fts5_boost_helps_stemmed_matches(tmp_db):
 # Test 7: Very high similarity bypasses keyword floor
 # ---------------------------------------------------------------------------
 
-def test_very_high_similarity_bypasses_keyword_floor(tmp_db):
+def test_very_high_similarity_bypasses_keyword_floor():
     """
     A document with original_distance < 0.25 (very high semantic similarity)
     should pass the keyword floor filter even if keyword_overlap == 0.
@@ -450,14 +441,13 @@ def test_very_high_similarity_bypasses_keyword_floor(tmp_db):
 # Test 8: Peek mode respects new thresholds
 # ---------------------------------------------------------------------------
 
-def test_peek_mode_respects_new_thresholds(tmp_db):
+def test_peek_mode_respects_new_thresholds(isolated_db):
     """
     Peek mode results must only contain items that passed the tightened thresholds
     (high_confidence < 0.40, possibly_relevant < 0.55). No result above 0.55 should appear.
     """
-    config, conn = tmp_db
-    for doc_id, content in [PDF_LEARNING, GRAFANA_LEARNING, PYTHON_ASYNC_LEARNING, REACT_TESTING_LEARNING, COMMAND_LEARNING]:
-        _insert(conn, doc_id, content)
+    config, conn = isolated_db
+    _insert_many(conn, [PDF_LEARNING, GRAFANA_LEARNING, PYTHON_ASYNC_LEARNING, REACT_TESTING_LEARNING, COMMAND_LEARNING])
 
     results = _full_search(config, conn, "slash command pdf layout", peek=True)
     peek_results = results["peek_results"]
@@ -506,12 +496,12 @@ def _run_search(config, capsys, query, tmp_path, **kwargs) -> Dict[str, Any]:
     return json.loads(capsys.readouterr().out)
 
 
-def test_peek_mode_does_not_backfill_from_possibly_relevant(tmp_db, tmp_path, capsys, monkeypatch):
+def test_peek_mode_does_not_backfill_from_possibly_relevant(isolated_db, tmp_path, capsys, monkeypatch):
     """
     With no high-confidence match available, peek mode must return nothing rather
     than backfilling from the possibly_relevant tier.
     """
-    config, conn = tmp_db
+    config, conn = isolated_db
     _insert(conn, *PDF_LEARNING, file_path=str(tmp_path / "pdf-layout.md"))
     conn.close()
 
@@ -526,11 +516,13 @@ def test_peek_mode_does_not_backfill_from_possibly_relevant(tmp_db, tmp_path, ca
     )
 
 
-def test_peek_mode_returns_high_confidence_result(tmp_db, tmp_path, capsys, monkeypatch):
+def test_peek_mode_returns_high_confidence_result(isolated_db, tmp_path, capsys, monkeypatch):
     """Peek mode still returns a genuine high-confidence match (no regression)."""
-    config, conn = tmp_db
-    _insert(conn, *PDF_LEARNING, file_path=str(tmp_path / "pdf-layout.md"))
-    _insert(conn, *GRAFANA_LEARNING, file_path=str(tmp_path / "grafana.md"))
+    config, conn = isolated_db
+    _insert_many(
+        conn, [PDF_LEARNING, GRAFANA_LEARNING],
+        file_paths=[str(tmp_path / "pdf-layout.md"), str(tmp_path / "grafana.md")],
+    )
     conn.close()
 
     output = _run_search(
@@ -542,16 +534,15 @@ def test_peek_mode_returns_high_confidence_result(tmp_db, tmp_path, capsys, monk
     assert PDF_LEARNING[0] in {r["id"] for r in output["learnings"]}
 
 
-def test_peek_mode_excludes_pinned_learning_and_promotes_next(tmp_db, tmp_path, capsys, monkeypatch):
+def test_peek_mode_excludes_pinned_learning_and_promotes_next(isolated_db, tmp_path, capsys, monkeypatch):
     """
     A pinned learning is dropped from peek results and the next non-pinned result
     takes its slot, proving the filter runs before the max_results slice.
     """
-    config, conn = tmp_db
+    config, conn = isolated_db
     pdf_file = tmp_path / "pdf-layout.md"
     command_file = tmp_path / "command-reference.md"
-    _insert(conn, *PDF_LEARNING, file_path=str(pdf_file))
-    _insert(conn, *COMMAND_LEARNING, file_path=str(command_file))
+    _insert_many(conn, [PDF_LEARNING, COMMAND_LEARNING], file_paths=[str(pdf_file), str(command_file)])
     conn.close()
 
     query = "slash command pdf layout"
@@ -587,11 +578,13 @@ def test_load_pinned_sources_parses_source_lines(tmp_path, monkeypatch):
     assert load_pinned_sources() == {"pdf-layout.md", "grafana-alerting-2026-01-01.md"}
 
 
-def test_non_peek_mode_still_returns_pinned_and_both_tiers(tmp_db, tmp_path, capsys, monkeypatch):
+def test_non_peek_mode_still_returns_pinned_and_both_tiers(isolated_db, tmp_path, capsys, monkeypatch):
     """The pinned exclusion is peek-only: manual search still reports both tiers."""
-    config, conn = tmp_db
-    _insert(conn, *PDF_LEARNING, file_path=str(tmp_path / "pdf-layout.md"))
-    _insert(conn, *COMMAND_LEARNING, file_path=str(tmp_path / "command-reference.md"))
+    config, conn = isolated_db
+    _insert_many(
+        conn, [PDF_LEARNING, COMMAND_LEARNING],
+        file_paths=[str(tmp_path / "pdf-layout.md"), str(tmp_path / "command-reference.md")],
+    )
     conn.close()
 
     _write_pinned_md(tmp_path, monkeypatch, "pdf-layout.md")